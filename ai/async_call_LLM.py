@@ -1,71 +1,169 @@
 import asyncio
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.output_parsers import PydanticOutputParser
+import math
+import random
+import time
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.messages import AIMessage
 from pydantic import RootModel, Field
 from typing import Dict
 import os
 from dotenv import load_dotenv
 import json
 
-from divide_into_five import divide_into_five
 from divide_into_five import WordDict
+from batch_planner import plan_batches, estimate_tokens, estimate_output_tokens, MAX_PARALLELISM, MAX_BATCH_SIZE, MAX_INPUT_TOKENS
+from translator_registry import TranslatorRegistry
+from concurrency import ConcurrencyLimiter
+from translation_cache import TranslationCache, make_cache_key
+from translation_memory import TranslationMemory
+from translation_store import TranslationStore, STORE_PATH, text_hash
+from singleflight import Abandoned, SingleFlight
+from validation import check_translation, validate_translations
+from prompts import (
+    PROMPTS, get_system_prompt, prompt_id, cache_prompt_id, resolve_mode, resolve_output_format, select_prompt_version,
+)
+from line_protocol import LineStreamParser, format_lines, parse_lines
+from markup import compress_tags, restore_tags, split_segments, join_segments
+from sentence_split import split_long_text
+from prefilter import skip_reason
+from rate_limit import RateLimiter, AIMDController, is_rate_limit_error
+from micro_batcher import MicroBatcher
+from provider_pool import Provider, ProviderPool, batch_profile, load_providers
+import metrics
+
+# .env는 프로세스 시작 시 한 번만 읽는다
+load_dotenv()
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+DEFAULT_TEMPERATURE = 0.3
+# 기본 프롬프트 모드 (full, compact, minimal, auto). 요청의 "prompt" 필드로 바꿀 수 있다
+DEFAULT_PROMPT_MODE = os.getenv("TRANSLATE_PROMPT", "full")
+# 기본 출력 형식 (json: JSON 객체, lines: "번호: 번역" 줄). 요청의 "output_format" 필드로 바꿀 수 있다
+DEFAULT_OUTPUT_FORMAT = os.getenv("TRANSLATE_OUTPUT_FORMAT", "json")
+# 줄 형식일 때 LLM 응답을 토큰 스트림으로 받아 완성된 줄부터 넘길지 여부
+STREAM_LLM_OUTPUT = os.getenv("TRANSLATE_STREAM_LLM_OUTPUT", "true").lower() in ("1", "true", "yes")
+# HTML 태그를 짧은 자리표시자(<x0>)로 바꿔 보낼지 여부
+COMPRESS_TAGS = os.getenv("TRANSLATE_COMPRESS_TAGS", "true").lower() in ("1", "true", "yes")
+# 숫자, URL, 브랜드 이름, 이미 목표 언어인 문자열 등을 LLM에 보내지 않고 그대로 돌려줄지 여부
+PREFILTER = os.getenv("TRANSLATE_PREFILTER", "true").lower() in ("1", "true", "yes")
+# 모든 요청을 합쳐 동시에 진행할 수 있는 LLM 호출 수
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("TRANSLATE_MAX_CONCURRENT_LLM_CALLS", "32"))
+# 누락/손상된 항목만 다시 요청하는 횟수와 재시도 배치 크기, 대기 시간(초)
+MAX_RETRIES = int(os.getenv("TRANSLATE_MAX_RETRIES", "2"))
+RETRY_BATCH_SIZE = int(os.getenv("TRANSLATE_RETRY_BATCH_SIZE", "10"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("TRANSLATE_RETRY_BACKOFF_SECONDS", "0.5"))
+# Gemini 할당량 (분당 요청 수 / 분당 토큰 수)과 429를 받았을 때 전체 호출을 멈추는 시간(초)
+REQUESTS_PER_MINUTE = int(os.getenv("TRANSLATE_REQUESTS_PER_MINUTE", "1000"))
+TOKENS_PER_MINUTE = int(os.getenv("TRANSLATE_TOKENS_PER_MINUTE", "1000000"))
+THROTTLE_PAUSE_SECONDS = float(os.getenv("TRANSLATE_THROTTLE_PAUSE_SECONDS", "2"))
+# 429를 받았을 때 동시 호출 수를 줄일 수 있는 하한
+MIN_CONCURRENT_LLM_CALLS = int(os.getenv("TRANSLATE_MIN_CONCURRENT_LLM_CALLS", "2"))
+# 우선순위 클래스별 LLM 슬롯 가중치. 둘 다 기다리고 있으면 interactive가 bulk보다 이 배수만큼 슬롯을 더 받는다
+# (inf면 interactive가 기다리는 동안 bulk는 슬롯을 받지 않는다)
+PRIORITY_WEIGHTS = {"interactive": float(os.getenv("TRANSLATE_INTERACTIVE_WEIGHT", "8")), "bulk": 1}
+# 요청의 "priority" 필드나 X-Translate-Priority 헤더가 없으면 문자열 수가 이 값 이하일 때 interactive로 본다
+INTERACTIVE_MAX_STRINGS = int(os.getenv("TRANSLATE_INTERACTIVE_MAX_STRINGS", "5"))
+# 배치 하나로 끝나는 작은 요청(문자열 MICRO_BATCH_MAX_STRINGS개 이하)은 다른 요청과 최대 MICRO_BATCH_DELAY_MS 동안 모아 보낸다.
+# LLM 호출 수와 프롬프트 토큰은 줄지만, 묶인 요청은 다른 요청의 출력까지 생성될 때까지 기다리므로 지연이 늘어난다.
+# 할당량(분당 요청 수)이나 비용이 병목일 때 켠다. 0이면 모으지 않는다
+MICRO_BATCH_DELAY_MS = float(os.getenv("TRANSLATE_MICRO_BATCH_DELAY_MS", "0"))
+MICRO_BATCH_MAX_STRINGS = int(os.getenv("TRANSLATE_MICRO_BATCH_MAX_STRINGS", "10"))
+# 숫자/날짜만 다른 문자열은 전에 번역한 템플릿에 지금 값을 넣어 LLM 없이 번역한다
+TRANSLATION_MEMORY = os.getenv("TRANSLATE_MEMORY", "true").lower() in ("1", "true", "yes")
+# 이 글자 수보다 긴 문자열은 문장 경계에서 나눠 여러 배치에 퍼뜨리고 번역 후 다시 잇는다. 0이면 나누지 않는다
+SEGMENT_MAX_CHARS = int(os.getenv("TRANSLATE_SEGMENT_MAX_CHARS", "300"))
+
+# 프로세스 전체에서 공유하는 LLM 호출 슬롯. 선택 문장 팝업 같은 짧은 요청이 페이지 번역 뒤에 줄 서지 않도록
+# 우선순위 클래스별로 슬롯을 나눠준다
+llm_limiter = ConcurrencyLimiter(MAX_CONCURRENT_LLM_CALLS, PRIORITY_WEIGHTS)
+
+# 할당량을 넘지 않도록 호출 전에 요청/토큰 버킷에서 차감한다
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+
+# 429/할당량 오류에 따라 llm_limiter의 동시 호출 수를 AIMD로 조절한다
+concurrency_controller = AIMDController(
+    llm_limiter,
+    min_limit=min(MIN_CONCURRENT_LLM_CALLS, MAX_CONCURRENT_LLM_CALLS),
+    max_limit=MAX_CONCURRENT_LLM_CALLS,
+)
+
+# LLM 공급자 풀 (TRANSLATE_PROVIDERS). 공급자별 지연/오류 통계는 모든 번역기가 함께 쓴다
+provider_pool = ProviderPool(load_providers(DEFAULT_MODEL))
+
+# 프로세스 안에서 공유하는 번역 캐시 (검색, 다음, 이전 같은 반복 UI 문구용)
+translation_cache = TranslationCache()
+
+# 숫자, 날짜, 개수만 다른 문자열을 위한 템플릿 번역 메모리
+translation_memory = TranslationMemory()
+
+# 재시작해도 남는 번역 저장소 (TRANSLATE_STORE_PATH를 지정했을 때만 쓴다)
+translation_store = TranslationStore(STORE_PATH) if STORE_PATH else None
+
+# 여러 요청이 동시에 같은 문자열을 번역하지 않도록 진행 중인 번역을 공유한다
+inflight_translations = SingleFlight()
+
+# 공유 상태는 /metrics를 읽을 때 값을 가져온다
+metrics.registry.gauge("translate_cache_entries", "Entries in the in-process translation cache", function=lambda: len(translation_cache))
+metrics.registry.gauge("translate_cache_hits", "In-process translation cache hits", function=lambda: translation_cache.hits)
+metrics.registry.gauge("translate_cache_misses", "In-process translation cache misses", function=lambda: translation_cache.misses)
+metrics.registry.gauge("translate_cache_hit_ratio", "In-process translation cache hit ratio", function=lambda: translation_cache.stats()["hit_ratio"])
+metrics.registry.gauge("translate_memory_templates", "Templates in the translation memory", function=lambda: len(translation_memory))
+metrics.registry.gauge("translate_memory_hits", "Strings translated by filling a remembered template", function=lambda: translation_memory.hits)
+metrics.registry.gauge("translate_memory_misses", "Template lookups with no remembered template", function=lambda: translation_memory.misses)
+metrics.registry.gauge("translate_memory_rejected", "Template lookups below the confidence threshold", function=lambda: translation_memory.rejected)
+metrics.registry.gauge("translate_memory_hit_ratio", "Translation memory hit ratio", function=lambda: translation_memory.stats()["hit_ratio"])
+metrics.registry.gauge("translate_store_hits", "Strings found in the persistent translation store", function=lambda: translation_store.hits if translation_store else 0)
+metrics.registry.gauge("translate_store_misses", "Strings not found in the persistent translation store", function=lambda: translation_store.misses if translation_store else 0)
+metrics.registry.gauge("translate_store_pending_writes", "Translations waiting to be written to the persistent store", function=lambda: translation_store.stats()["pending"] if translation_store else 0)
+metrics.registry.gauge("translate_store_write_errors", "Failed write-behind flushes to the persistent store", function=lambda: translation_store.write_errors if translation_store else 0)
+metrics.registry.gauge(
+    "translate_provider_latency_p95_seconds", "Recent p95 latency of each LLM provider (hedging threshold)", ("provider",),
+    function=lambda: provider_pool.latency_p95(),
+)
+metrics.registry.gauge(
+    "translate_provider_error_rate", "Recent error rate of each LLM provider", ("provider",),
+    function=lambda: provider_pool.error_rates(),
+)
+metrics.registry.gauge("translate_inflight_coalesced", "Strings that waited on another request's in-flight translation", function=lambda: inflight_translations.coalesced)
+metrics.registry.gauge("translate_llm_concurrency_limit", "Current AIMD limit on concurrent LLM calls", function=lambda: llm_limiter.limit)
+metrics.registry.gauge("translate_llm_in_flight", "LLM calls currently in progress", function=lambda: llm_limiter.active)
+metrics.registry.gauge("translate_llm_waiting", "Calls waiting for an LLM slot", function=lambda: llm_limiter.waiting)
+metrics.registry.gauge(
+    "translate_llm_waiting_by_priority", "Calls waiting for an LLM slot, by priority class", ("priority",),
+    function=llm_limiter.waiting_by_priority,
+)
+
+
+def resolve_priority(priority, string_count):
+    # 지정하지 않았거나 auto면 요청 크기로 정한다
+    if priority in (None, "", "auto"):
+        return "interactive" if string_count <= INTERACTIVE_MAX_STRINGS else "bulk"
+    if priority not in PRIORITY_WEIGHTS:
+        raise ValueError(f"알 수 없는 우선순위입니다: {priority} (가능한 값: {', '.join(PRIORITY_WEIGHTS)}, auto)")
+    return priority
+
+
+def validate_options(input_dict):
+    # 요청의 prompt, output_format, priority를 번역(스트림)을 시작하기 전에 확인한다. 잘못되면 ValueError
+    resolve_mode(input_dict.get("prompt", DEFAULT_PROMPT_MODE))
+    resolve_output_format(input_dict.get("output_format", DEFAULT_OUTPUT_FORMAT))
+    resolve_priority(input_dict.get("priority"), 0)
+
 
 class TranslatedDictionary(RootModel):
     root: Dict[str, str] = Field(default_factory=dict, description="The translated phrases")
 
 
-def create_translator():
-    load_dotenv()
-
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        api_key=os.getenv("GEMINI_API"),
-        temperature=0.3
-    )
+def create_translator(
+    temperature=DEFAULT_TEMPERATURE, prompt_version=prompt_id("full"), output_format="json", llm=None, pool=None,
+):
+    # 기본은 공유 공급자 풀(provider_pool)로 보낸다.
+    # llm을 넘기면 그 모델 하나만 쓰고(벤치마크의 가짜 LLM 등), pool을 넘기면 그 풀을 쓴다
+    if pool is None:
+        pool = ProviderPool([Provider("llm", lambda _: llm)]) if llm is not None else provider_pool
 
-    system_prompt_str = """
-    You are a professional translator.
-    Translate the following numbered phrases into {target_language}.
-    Only translate the text after the colon (:) in each line. Do not translate or modify the numbers or any JSON syntax.
-    Return your translations in the same numbered format, enclosed in a JSON object like this:
-    {{"0": "translated text 0", "1": "translated text 1", ...}}
-    Each phrase must be translated exactly as it is provided, without any additional interpretation, context, or meaning.
-    Your translation should be literal, preserving the exact words and structure of the original text.
-    Do not change the meaning of the phrases, infer additional information, or attempt to create a context.
-    Translate only what is explicitly written.
-    These phrases are independent of each other, so treat each one as a standalone translation.
-    Only use parentheses to include the original text when translating proper nouns, names, technical terms, or specific words that should not be translated.
-    Use parentheses sparingly and only when absolutely necessary.
-    Preserve any HTML tags such as <span> exactly as they are. Do not alter, add, or remove any characters, words, or line breaks that are not present in the original text.
-
-    Here are examples of correct translations:
-    
-    Example 1:
-    - Original: 네이버 클라우드
-    - Correct translation: Naver Cloud
-    
-    Example 2:
-    - Original: 이전
-    - Correct translation: Previous
-    
-    Example 3:
-    - Original: 다음
-    - Correct translation: Next
-    
-    Example 4:
-    - Original: LIVE
-    - Correct translation: LIVE
-    
-    Example 5:
-    - Original: 연합뉴스
-    - Correct translation: Yonhap News
-    
-    Example 6:
-    - Original: <a>배드민턴협회, 진상조사위 구성…'부상 관리 소홀'엔 적극 반박</a>
-    - Correct translation: <a>Badminton Association forms fact-finding committee... strongly refutes 'negligence in injury management'</a>
-    """
+    system_prompt_str = get_system_prompt(prompt_version, output_format)
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", system_prompt_str),
@@ -76,60 +174,594 @@ def create_translator():
 
     parser = PydanticOutputParser(pydantic_object=TranslatedDictionary)
 
-    chain = RunnablePassthrough() | prompt | llm | parser
+    # 프롬프트 포맷 -> LLM 호출 -> 파싱을 단계별로 재기 위해 체인으로 묶지 않고 하나씩 호출한다
 
-    async def translate(input_dict, target_language):
-        if isinstance(input_dict, WordDict):
-            input_dict = input_dict.to_dict()
-        
-        # 번역할 텍스트 값만 추출
-        texts_to_translate = list(input_dict.values())
-        
-        # LLM을 위한 간단한 번호 목록 생성
-        numbered_texts = "\n".join(f"{i}: {text}" for i, text in enumerate(texts_to_translate))
-        
-        try:
-            result = await asyncio.to_thread(chain.invoke, {
+    # 요청마다 붙는 시스템 프롬프트의 토큰 수 (속도 제한 계산용)
+    prompt_tokens = estimate_tokens(system_prompt_str)
+
+    # 줄 형식은 줄 단위로 완성되므로 응답을 끝까지 기다리지 않고 스트림으로 읽을 수 있다
+    streaming = output_format == "lines" and STREAM_LLM_OUTPUT
+
+    async def stream_lines(prompt_value, keys, profile, on_item, started_at):
+        # 완성된 줄을 바로 on_item으로 넘기고, 기다리던 번호가 모두 오면 생성을 멈춘다
+        line_parser = LineStreamParser()
+        expected = {str(i) for i in range(len(keys))}
+        pieces = []
+        usage = None
+        delivered = []
+
+        def deliver(items):
+            for index, text in items:
+                if index not in expected:
+                    continue
+                if not delivered:
+                    metrics.FIRST_LINE_SECONDS.observe(time.perf_counter() - started_at)
+                delivered.append(index)
+                if on_item is not None:
+                    on_item(keys[int(index)], text)
+
+        async with pool.stream(prompt_value, profile, temperature) as stream:
+            async for chunk in stream:
+                # 조각 메시지를 합치는 비용이 크므로 본문과 사용량만 모은다
+                pieces.append(chunk.content)
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                deliver(line_parser.feed(chunk.content))
+                if expected <= line_parser.translations.keys():
+                    # 같은 줄을 반복하는 등 필요 없는 생성이 이어지면 여기서 끊는다
+                    metrics.EARLY_STOPS.inc()
+                    break
+            else:
+                deliver(line_parser.close())
+        return AIMessage(content="".join(pieces), usage_metadata=usage), line_parser
+
+    async def request_translations(input_dict, target_language, on_item=None, priority=None):
+        # LLM 한 번 호출. 번호로 돌아온 결과를 원래 키에 다시 붙인다.
+        # 스트리밍이면 완성된 항목을 응답이 끝나기 전에 on_item(key, 번역)으로 넘긴다
+        keys = list(input_dict.keys())
+        metrics.BATCH_SIZE.observe(len(keys))
+        # 짧은 UI 문구 배치와 긴 문장 배치는 다른 공급자로 보낼 수 있다
+        profile = batch_profile(input_dict.values())
+
+        with metrics.STAGE_SECONDS.time(stage="format"):
+            # LLM을 위한 간단한 번호 목록 생성
+            if output_format == "lines":
+                # 줄 형식에서는 문장 안의 줄바꿈이 번호 줄을 깨지 않도록 \n으로 바꿔 보낸다
+                numbered_texts = format_lines(input_dict[key] for key in keys)
+            else:
+                numbered_texts = "\n".join(f"{i}: {input_dict[key]}" for i, key in enumerate(keys))
+            prompt_value = await prompt.ainvoke({
                 "numbered_texts": numbered_texts,
                 "target_language": target_language
             })
-            
-            if result is None or not isinstance(result.root, dict):
-                raise ValueError("LLM에서 예상치 못한 출력값을 받았습니다.")
-            
-            # 결과를 후처리하여 원래 구조를 복원
-            translated_dict = {}
-            for key, value in zip(input_dict.keys(), result.root.values()):
-                translated_dict[key] = value.strip()
-            
-            return translated_dict
-        except Exception as e:
-            print(f"번역 중 오류 발생: {e}")
-            # 오류 발생 시 번역되지 않은 원본 딕셔너리를 반환
-            return input_dict
+
+        input_tokens = prompt_tokens + estimate_tokens(numbered_texts)
+        estimated_tokens = input_tokens + sum(estimate_output_tokens(text) for text in input_dict.values())
+
+        queued_at = time.perf_counter()
+        await rate_limiter.acquire(estimated_tokens)
+
+        # 스레드 풀을 거치지 않고 LLM의 비동기 경로를 그대로 사용한다
+        async with llm_limiter.slot(priority):
+            started_at = time.perf_counter()
+            metrics.STAGE_SECONDS.observe(started_at - queued_at, stage="queue")
+            metrics.LLM_WAIT_SECONDS.observe(started_at - queued_at, priority=priority or "bulk")
+            try:
+                if streaming:
+                    message, line_parser = await stream_lines(prompt_value, keys, profile, on_item, started_at)
+                else:
+                    message = await pool.invoke(prompt_value, profile, temperature)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    metrics.LLM_CALLS.inc(outcome="throttled")
+                    concurrency_controller.on_throttle()
+                    rate_limiter.penalize(THROTTLE_PAUSE_SECONDS)
+                else:
+                    metrics.LLM_CALLS.inc(outcome="error")
+                raise
+            finally:
+                metrics.STAGE_SECONDS.observe(time.perf_counter() - started_at, stage="llm")
+        metrics.LLM_CALLS.inc(outcome="ok")
+        concurrency_controller.on_success()
+
+        # 모델이 사용량을 알려주면 그 값을, 아니면 추정치를 쓴다 (중간에 멈춘 스트림은 추정치)
+        usage = getattr(message, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or input_tokens
+        output_tokens = usage.get("output_tokens") or estimate_tokens(message.content)
+        metrics.LLM_TOKENS.observe(input_tokens, direction="input")
+        metrics.LLM_TOKENS.observe(output_tokens, direction="output")
+        rate_limiter.adjust(input_tokens + output_tokens - estimated_tokens)
+
+        with metrics.STAGE_SECONDS.time(stage="parse"):
+            if output_format == "lines":
+                # 깨진 줄만 버리고 나머지는 살린다. 빠진 번호는 검증 단계에서 재시도 대상이 된다
+                if streaming:
+                    translations, malformed = line_parser.translations, line_parser.malformed
+                else:
+                    translations, malformed = parse_lines(message.content)
+                metrics.MALFORMED_LINES.inc(malformed)
+                if not translations:
+                    metrics.PARSE_FAILURES.inc(format=output_format)
+            else:
+                try:
+                    result = parser.parse(message.content)
+                except Exception:
+                    # JSON은 따옴표 하나만 어긋나도 배치 전체를 버리게 된다
+                    metrics.PARSE_FAILURES.inc(format=output_format)
+                    raise
+
+                if result is None or not isinstance(result.root, dict):
+                    metrics.PARSE_FAILURES.inc(format=output_format)
+                    raise ValueError("LLM에서 예상치 못한 출력값을 받았습니다.")
+                translations = result.root
+
+            # 순서가 아니라 번호로 맞춘다 (빠지거나 합쳐진 번호가 있어도 뒤 항목이 밀리지 않음)
+            return {key: translations.get(str(i)) for i, key in enumerate(keys)}
+
+    async def translate(input_dict, target_language, on_item=None, priority=None):
+        # 검증을 통과한 번역을 {key: 번역}으로 반환한다.
+        # on_item을 넘기면 항목마다 확정되는 즉시 on_item(key, 번역)을 한 번씩 부른다.
+        # priority: LLM 슬롯을 받을 우선순위 클래스 (interactive, bulk. 없으면 bulk)
+        if isinstance(input_dict, WordDict):
+            input_dict = input_dict.to_dict()
+
+        translated_dict = {}
+        remaining = dict(input_dict)
+
+        # 태그와 속성은 자리표시자로 바꿔 보내고, 받은 번역에서 되돌린다
+        placeholders = {}
+        if COMPRESS_TAGS:
+            for key, text in input_dict.items():
+                compressed, tags = compress_tags(text)
+                if tags:
+                    placeholders[key] = (compressed, tags)
+                    metrics.MARKUP_CHARS.inc(len(text), stage="original")
+                    metrics.MARKUP_CHARS.inc(len(compressed), stage="compressed")
+
+        def outgoing(chunk):
+            return {key: placeholders[key][0] if key in placeholders else text for key, text in chunk.items()}
+
+        def restore(key, value):
+            # 자리표시자가 빠지거나 중복되면 그대로 두어 검증에서 "tags"로 걸리게 한다
+            if value is None or key not in placeholders:
+                return value
+            restored = restore_tags(value, placeholders[key][1])
+            return value if restored is None else restored
+
+        def deliver(key, value):
+            if key in translated_dict:
+                return
+            translated_dict[key] = value
+            if on_item is not None:
+                on_item(key, value)
+
+        def on_streamed(key, value):
+            # 스트리밍 중 완성된 줄은 검증을 통과하면 응답이 끝나기 전에 넘긴다
+            value = restore(key, value)
+            if check_translation(input_dict[key], value) is None:
+                deliver(key, value.strip())
+
+        async def translate_segments(keys):
+            # 태그가 깨진 문자열은 태그 사이의 텍스트만 따로 번역해서 원래 태그 사이에 다시 끼운다.
+            # 태그가 없는 짧은 조각들이라 한 번에 보내도 싸고, 구조는 원문 그대로 보장된다
+            parts = {key: split_segments(input_dict[key]) for key in keys}
+            segments = {
+                (key, i): part.strip()
+                for key in keys
+                for i, (is_tag, part) in enumerate(parts[key])
+                if not is_tag and part.strip()
+            }
+            valid = {}
+            if segments:
+                try:
+                    result = await request_translations(segments, target_language, priority=priority)
+                    valid, _ = validate_translations(segments, result)
+                except Exception as e:
+                    print(f"조각 번역 중 오류 발생: {e}")
+            rebuilt = {}
+            for key in keys:
+                translations = {i: value for (segment_key, i), value in valid.items() if segment_key == key}
+                joined = join_segments(parts[key], translations)
+                metrics.SEGMENT_FALLBACKS.inc(outcome="ok" if joined is not None else "failed")
+                if joined is not None:
+                    rebuilt[key] = joined
+            return rebuilt
+
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt == 0:
+                chunks = [remaining]
+            else:
+                # 실패한 항목만 더 작은 배치로 나눠 다시 요청한다
+                metrics.RETRIES.inc(len(remaining))
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+                items = list(remaining.items())
+                chunk_size = max(1, min(RETRY_BATCH_SIZE, math.ceil(len(items) / 2)))
+                chunks = [dict(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+
+            results = await asyncio.gather(
+                *(request_translations(outgoing(chunk), target_language, on_streamed, priority) for chunk in chunks),
+                return_exceptions=True
+            )
+
+            remaining = {}
+            broken_tags = []
+            for chunk, result in zip(chunks, results):
+                if isinstance(result, Exception):
+                    print(f"번역 중 오류 발생: {result}")
+                    # 스트림이 끊기기 전에 이미 넘긴 항목은 다시 요청하지 않는다
+                    remaining.update({key: text for key, text in chunk.items() if key not in translated_dict})
+                    continue
+                result = {key: restore(key, value) for key, value in result.items()}
+                valid, failed = validate_translations(chunk, result)
+                for key, value in valid.items():
+                    deliver(key, value)
+                for key, reason in failed.items():
+                    if reason == "tags":
+                        broken_tags.append(key)
+                    else:
+                        remaining[key] = chunk[key]
+                if failed:
+                    print(f"번역 결과 검증 실패 {len(failed)}건: {sorted(set(failed.values()))}")
+
+            if broken_tags:
+                # 태그가 깨진 항목은 문자열 전체를 다시 보내지 않고 조각 단위로 바로 다시 번역한다
+                rebuilt = await translate_segments(broken_tags)
+                for key in broken_tags:
+                    if key in rebuilt:
+                        deliver(key, rebuilt[key])
+                    else:
+                        remaining[key] = input_dict[key]
+
+            if not remaining:
+                break
+
+        # 끝까지 실패한 항목은 빠진 채로 반환하고, 호출한 쪽에서 원문으로 채운다
+        return translated_dict
 
     return translate  # translate 함수 반환
 
 
-async def translate_text(input_dict: dict) -> dict:
-    translator = create_translator()
+# 요청마다 create_translator를 다시 부르지 않도록 프로세스 전체에서 공유하는 레지스트리
+translator_registry = TranslatorRegistry(create_translator)
+
+
+async def send_micro_batch(group, texts, on_item, priority):
+    # 여러 요청에서 모은 문자열을 LLM 한 번으로 번역한다
+    target_language, prompt_mode, output_format = group
+    prompt_version = select_prompt_version(texts.values(), prompt_mode, output_format)
+    translator = translator_registry.get(DEFAULT_TEMPERATURE, prompt_version, output_format)
+    return await translator(texts, target_language, on_item, priority)
+
+
+# 작은 요청들을 잠깐 모아 한 번의 LLM 호출로 보낸다
+micro_batcher = MicroBatcher(
+    send_micro_batch,
+    max_delay=MICRO_BATCH_DELAY_MS / 1000,
+    max_input_tokens=MAX_INPUT_TOKENS,
+    max_strings=MAX_BATCH_SIZE,
+)
+
+
+def warmup_translators():
+    # 서버 시작 시 프롬프트 변형별 번역기를 기본 출력 형식으로 미리 만들어 둔다
+    translator_registry.warmup(
+        [(DEFAULT_TEMPERATURE, prompt_id(name), DEFAULT_OUTPUT_FORMAT) for name in PROMPTS]
+    )
+    # LLM 클라이언트(공급자 SDK 임포트 포함)와 저장소 연결도 첫 요청 전에 만든다
+    provider_pool.warmup(DEFAULT_TEMPERATURE)
+    if translation_store is not None:
+        translation_store.open()
+
 
+async def translate_text_stream(input_dict: dict, max_parallelism: int = MAX_PARALLELISM, record_metrics: bool = True):
+    # 배치가 끝날 때마다 {"index", "translation"} 레코드를 내보내고,
+    # 마지막에 요약 레코드({"done": True, ...})를 내보내는 async generator
+    # record_metrics: False면 요청 단위 지표를 남기지 않는다 (요청 안에서 다시 번역할 때)
     texts = input_dict["strs"]
     target_language = input_dict["language"]
+    prompt_mode = resolve_mode(input_dict.get("prompt", DEFAULT_PROMPT_MODE))
+    output_format = resolve_output_format(input_dict.get("output_format", DEFAULT_OUTPUT_FORMAT))
+    priority = resolve_priority(input_dict.get("priority"), len(texts))
+    stats = {"skipped": 0, "cached": 0, "stored": 0, "memory": 0, "translated": 0, "fallback": 0}
+    request_started_at = time.perf_counter()
+    if record_metrics:
+        metrics.REQUEST_STRINGS.observe(len(texts))
 
-    cut_box = divide_into_five(texts)
+    # 번역할 필요가 없는 문자열은 캐시/배치 단계 전에 원문 그대로 돌려준다
+    skipped_records = []
+    if PREFILTER:
+        with metrics.STAGE_SECONDS.time(stage="prefilter"):
+            for i, text in enumerate(texts):
+                reason = skip_reason(text, target_language)
+                if reason is not None:
+                    metrics.PREFILTER_SKIPS.inc(reason=reason)
+                    skipped_records.append({"index": i, "translation": text})
+    skipped = {record["index"] for record in skipped_records}
 
-    # Translate all dictionaries concurrently
-    tasks = [translator(d, target_language) for d in cut_box.values()]
-    translated_dicts = await asyncio.gather(*tasks)
+    split_started_at = time.perf_counter()
+    # 캐시에 있는 문자열은 LLM에 보내지 않고, 같은 문자열은 한 번만 번역한다
+    cache_prompt = cache_prompt_id(prompt_mode)
+    # 캐시와 번역 메모리는 공급자 풀의 모델 집합별로 나눈다 (영구 저장소는 백엔드 테이블처럼 모델과 무관하다)
+    cache_models = provider_pool.fingerprint()
+    cached_records = []
+    pending = {}  # key -> 해당 문자열이 나오는 인덱스 목록
+    for i, text in enumerate(texts):
+        if i in skipped:
+            continue
+        key = make_cache_key(text, target_language, cache_models, cache_prompt)
+        if key in pending:
+            pending[key].append(i)
+            continue
+        cached = translation_cache.get(key)
+        if cached is not None:
+            cached_records.append({"index": i, "translation": cached})
+        else:
+            pending[key] = [i]
+
+    # 프로세스 캐시에 없는 문자열은 영구 저장소에서 한 번에 찾는다
+    stored_records = []
+    if translation_store is not None and pending:
+        started_at = time.perf_counter()
+        hashes = {key: text_hash(texts[indexes[0]]) for key, indexes in pending.items()}
+        try:
+            stored = await asyncio.to_thread(translation_store.get_many, list(hashes.values()), target_language)
+        except Exception as e:
+            print(f"번역 저장소 조회 실패: {e}")
+            stored = {}
+        for key, digest in hashes.items():
+            value = stored.get(digest)
+            if value is not None:
+                translation_cache.put(key, value)
+                stored_records.extend({"index": i, "translation": value} for i in pending.pop(key))
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - started_at, stage="store")
+
+    # 숫자/날짜만 다른 문자열을 전에 번역했으면 그 템플릿을 쓴다.
+    # 근사 번역이므로 같은 문자열의 번역(캐시, 저장소)이 없을 때만 쓴다
+    memory_records = []
+    if TRANSLATION_MEMORY:
+        for key in list(pending):
+            remembered = translation_memory.lookup(texts[pending[key][0]], target_language, cache_models, cache_prompt)
+            if remembered is not None:
+                memory_records.extend({"index": i, "translation": remembered} for i in pending.pop(key))
+
+    # 다른 요청이 이미 번역 중인 문자열은 그 결과를 기다린다
+    owned_keys = []
+    waiting = []
+    for key in pending:
+        future, owner = inflight_translations.claim(key)
+        if owner:
+            owned_keys.append(key)
+        else:
+            waiting.append((key, future))
+
+    # 긴 문자열은 문장 단위 조각으로 나눈다. 배치에는 조각 단위로 들어가고, 조각이 모두 돌아오면 순서대로 잇는다
+    owned_texts = [texts[pending[key][0]] for key in owned_keys]
+    units = []  # (owned_keys 안에서의 인덱스, 조각)
+    pieces_of = []  # owned 인덱스 -> 조각 목록
+    for j, text in enumerate(owned_texts):
+        pieces = split_long_text(text, SEGMENT_MAX_CHARS) if SEGMENT_MAX_CHARS else [text]
+        if len(pieces) > 1:
+            metrics.SPLIT_PIECES.observe(len(pieces))
+        pieces_of.append(pieces)
+        units.extend((j, piece) for piece in pieces)
+
+    # 추정 토큰 수 기준으로 배치를 나눈다 (키는 units 안에서의 인덱스).
+    # 태그는 자리표시자로 바뀌어 나가므로 바뀐 길이로 예산을 잡되, 배치에는 원문을 넣는다
+    # (자리표시자로 바꾸고 되돌리는 것은 번역기가 한다)
+    unit_texts = [piece for _, piece in units]
+    if COMPRESS_TAGS:
+        planned = plan_batches([compress_tags(text)[0] for text in unit_texts], max_parallelism=max_parallelism)
+        batches = []
+        for batch in planned:
+            keys = list(batch.to_dict())
+            batches.append(WordDict(unit_texts[keys[0]:keys[-1] + 1], start=keys[0]))
+    else:
+        batches = plan_batches(unit_texts, max_parallelism=max_parallelism)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - split_started_at, stage="split")
+
+    stats["skipped"] = len(skipped_records)
+    stats["cached"] = len(cached_records)
+    stats["stored"] = len(stored_records)
+    stats["memory"] = len(memory_records)
+    for record in skipped_records + cached_records + stored_records + memory_records:
+        yield record
+
+    queue = asyncio.Queue()
+    done = object()
+
+    def emit(key, value):
+        for i in pending[key]:
+            if value:
+                stats["translated"] += 1
+                queue.put_nowait({"index": i, "translation": value})
+            else:
+                # 번역되지 않은 항목은 원문으로 채운다
+                stats["fallback"] += 1
+                queue.put_nowait({"index": i, "translation": texts[i]})
+
+    async def run_owned():
+        try:
+            # 한 요청이 동시에 보내는 배치 수를 제한한다
+            semaphore = asyncio.Semaphore(max_parallelism)
+            # 배치 하나로 끝나는 작은 요청은 다른 요청과 묶어서 보낸다
+            micro_batch = MICRO_BATCH_DELAY_MS > 0 and len(batches) == 1 and len(units) <= MICRO_BATCH_MAX_STRINGS
+            # 나눈 문자열은 조각별 결과({unit 인덱스: 번역 또는 실패 시 None})를 모았다가 마지막 조각이 오면 확정한다
+            piece_results = [{} for _ in owned_keys]
 
-    translated_texts = []
-    for translated_dict in translated_dicts:
-        translated_texts.extend(translated_dict.values())
+            def finish_unit(u, value):
+                j, _ = units[u]
+                results = piece_results[j]
+                results[u] = value
+                pieces = pieces_of[j]
+                if len(results) < len(pieces):
+                    return
+                with metrics.STAGE_SECONDS.time(stage="reassemble"):
+                    key = owned_keys[j]
+                    if len(pieces) > 1:
+                        # 조각은 순서와 상관없이 도착하므로 unit 인덱스 순서로 잇는다.
+                        # 일부 조각만 실패했으면 그 조각만 원문으로 두고, 캐시에는 넣지 않는다
+                        ordered = [results[u] for u in sorted(results)]
+                        complete = None not in ordered
+                        value = None
+                        if any(piece is not None for piece in ordered):
+                            value = join_segments(
+                                [(False, piece) for piece in pieces],
+                                {i: piece if piece is not None else pieces[i].strip() for i, piece in enumerate(ordered)},
+                            )
+                    else:
+                        complete = value is not None
+                    if complete:
+                        translation_cache.put(key, value)
+                        if translation_store is not None:
+                            # 디스크에는 모아서 나중에 쓴다
+                            translation_store.put_many({text_hash(owned_texts[j]): value}, target_language)
+                        if TRANSLATION_MEMORY:
+                            translation_memory.learn(owned_texts[j], value, target_language, cache_models, cache_prompt)
+                    inflight_translations.resolve(key, value)
+                    emit(key, value)
 
-    result = {"strs": translated_texts, "language": target_language}
+            async def run_batch(batch):
+                # 배치 크기에 맞는 프롬프트 변형을 고른다 (auto 모드)
+                prompt_version = select_prompt_version(batch.to_dict().values(), prompt_mode, output_format)
+                translator = translator_registry.get(DEFAULT_TEMPERATURE, prompt_version, output_format)
+
+                def on_item(u, value):
+                    # 번역이 확정되는 대로 캐시에 넣고, 기다리는 요청을 풀고, 레코드를 내보낸다
+                    finish_unit(u, value)
+
+                async with semaphore:
+                    if micro_batch:
+                        translated_dict = await micro_batcher.submit(
+                            (target_language, prompt_mode, output_format), batch.to_dict(), on_item, priority
+                        )
+                    else:
+                        translated_dict = await translator(batch, target_language, on_item, priority)
+                # 끝까지 번역되지 않은 항목은 원문으로 채운다
+                for u in batch.to_dict():
+                    if u not in translated_dict:
+                        finish_unit(u, None)
+
+            await asyncio.gather(*(run_batch(batch) for batch in batches))
+        except asyncio.CancelledError:
+            # 이 요청이 취소되면 기다리던 요청이 직접 번역하도록 넘긴다 (None은 번역 실패에만 쓴다)
+            for key in owned_keys:
+                inflight_translations.abandon(key)
+            raise
+        finally:
+            # 실패하거나 LLM이 빠뜨린 항목도 기다리는 요청이 멈추지 않도록 풀어준다
+            for key in owned_keys:
+                inflight_translations.resolve(key, None)
+
+    async def translate_again(text):
+        # 번역 실패면 None을 반환한다
+        value = None
+        async for record in translate_text_stream(
+            {"strs": [text], "language": target_language, "prompt": prompt_mode, "output_format": output_format, "priority": priority},
+            max_parallelism,
+            record_metrics=False,
+        ):
+            if "index" in record:
+                value = record["translation"]
+            elif record.get("done") and record["fallback"]:
+                value = None
+        return value
+
+    async def wait_shared(key, future):
+        try:
+            value = await inflight_translations.wait(future)
+        except Abandoned:
+            # 번역하던 요청이 취소되었으면 이 요청이 다시 맡는다 (다른 대기 요청과는 다시 한 번만 번역한다)
+            value = await translate_again(texts[pending[key][0]])
+        emit(key, value)
+
+    async def produce():
+        try:
+            await asyncio.gather(run_owned(), *(wait_shared(key, future) for key, future in waiting))
+        finally:
+            queue.put_nowait(done)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            record = await queue.get()
+            if record is done:
+                break
+            yield record
+        # 배치에서 난 예외는 여기서 다시 올린다
+        await producer
+    finally:
+        # 클라이언트가 중간에 끊으면 남은 번역 작업도 취소한다
+        if not producer.done():
+            producer.cancel()
+
+    if record_metrics:
+        metrics.RESULTS.inc(stats["skipped"], source="skipped")
+        metrics.RESULTS.inc(stats["cached"], source="cache")
+        metrics.RESULTS.inc(stats["stored"], source="store")
+        metrics.RESULTS.inc(stats["memory"], source="memory")
+        metrics.RESULTS.inc(stats["translated"], source="llm")
+        metrics.RESULTS.inc(stats["fallback"], source="fallback")
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - request_started_at, priority=priority)
+
+    yield {"done": True, "language": target_language, "total": len(texts), **stats}
+
+
+async def translate_text(input_dict: dict, max_parallelism: int = MAX_PARALLELISM) -> dict:
+    texts = input_dict["strs"]
+    target_language = input_dict["language"]
+
+    translated_texts = list(texts)
+    skipped = 0
+    async for record in translate_text_stream(input_dict, max_parallelism):
+        if "index" in record:
+            translated_texts[record["index"]] = record["translation"]
+        elif record.get("done"):
+            skipped = record["skipped"]
+
+    # skipped: 사전 필터가 LLM에 보내지 않고 그대로 돌려준 문자열 수
+    result = {"strs": translated_texts, "language": target_language, "skipped": skipped}
     return result
 
+
+async def translate_bulk(input_dict: dict, max_parallelism: int = MAX_PARALLELISM) -> dict:
+    # 여러 문서를 여러 언어로 한 번에 번역한다. 우선순위를 지정하지 않으면 bulk로 처리한다.
+    #   입력: {"documents": [{"id": "...", "strs": [...]}, ...], "languages": ["ko", "ja"], "prompt"?, "output_format"?, "priority"?}
+    #   출력: {"results": {문서 id: {언어: [번역]}}, "stats": {언어: 요약}}
+    # 언어마다 모든 문서의 문자열을 하나로 이어서 번역하므로 문서 사이에서도 중복이 제거되고
+    # 배치가 문서 경계를 넘어 채워진다. 언어끼리는 동시에 진행하고 LLM 호출 슬롯은 함께 쓴다.
+    documents = input_dict["documents"]
+    languages = input_dict["languages"]
+    ids = [str(document.get("id", i)) for i, document in enumerate(documents)]
+    if len(set(ids)) != len(ids):
+        raise ValueError("문서 id가 중복되었습니다.")
+
+    texts = []
+    offsets = []
+    for document in documents:
+        offsets.append(len(texts))
+        texts.extend(document["strs"])
+    options = {name: input_dict[name] for name in ("prompt", "output_format") if name in input_dict}
+    options["priority"] = input_dict.get("priority") or "bulk"
+
+    async def run_language(language):
+        translated_texts = list(texts)
+        summary = {}
+        async for record in translate_text_stream({"strs": texts, "language": language, **options}, max_parallelism):
+            if "index" in record:
+                translated_texts[record["index"]] = record["translation"]
+            else:
+                summary = {name: value for name, value in record.items() if name not in ("done", "language")}
+        return translated_texts, summary
+
+    outputs = await asyncio.gather(*(run_language(language) for language in languages))
+
+    results = {document_id: {} for document_id in ids}
+    stats = {}
+    for language, (translated_texts, summary) in zip(languages, outputs):
+        stats[language] = summary
+        for document_id, document, offset in zip(ids, documents, offsets):
+            results[document_id][language] = translated_texts[offset:offset + len(document["strs"])]
+    return {"results": results, "stats": stats}
+
 if __name__ == "__main__":
     input_dict = {"strs":["Join us in Silicon Valley September 18-19 at the 2024 PyTorch Conference.<a>Learn more</a>.","Learn","Get Started","Run PyTorch locally or get started quickly with one of the supported cloud platforms","Tutorials","Whats new in PyTorch tutorials","Learn the Basics","Familiarize yourself with PyTorch concepts and modules","PyTorch Recipes","Bite-size, ready-to-deploy PyTorch code examples","Intro to PyTorch - YouTube Series","Master PyTorch basics with our engaging YouTube tutorial series","Ecosystem","Tools","Learn about the tools and frameworks in the PyTorch Ecosystem","Community","Join the PyTorch developer community to contribute, learn, and get your questions answered.","Forums","A place to discuss PyTorch code, issues, install, research","Developer Resources","Find resources and get questions answered","Contributor Awards - 2023","Award winners announced at this year's PyTorch Conference","Edge","About PyTorch Edge","Build innovative and privacy-aware AI experiences for edge devices","ExecuTorch","End-to-end solution for enabling on-device inference capabilities across mobile and edge devices","Docs","PyTorch","Explore the documentation for comprehensive guidance on how to use PyTorch.","PyTorch Domains","Read the PyTorch Domains documentation to learn more about domain-specific libraries.","Blog &amp; News","PyTorch Blog","Catch up on the latest technical news and happenings","Community Blog","Stories from the PyTorch ecosystem","Videos","Learn about the latest PyTorch tutorials, new, and more","Community Stories","Learn how our community solves real, everyday machine learning problems with PyTorch","Events","Find events, webinars, and podcasts","About","PyTorch Foundation","Learn more about the PyTorch Foundation.","<span>Governing Board</span>","<a>Become a Member</a>","X","Get Started","Select preferences and run the command to install PyTorch locally, or\n          get started quickly with one of the supported cloud platforms.","Start Locally","PyTorch 2.0","Start via Cloud Partners","Previous PyTorch Versions","ExecuTorch","Shortcuts","<a>Prerequisites</a>","<a>macOS Version</a>","<a>Python</a>","<a>Package Manager</a>","<a>Installation</a>","<a>Anaconda</a>","<a>pip</a>","<a>Verification</a>","<a>Building from source</a>","<a>Prerequisites</a>","<a>Prerequisites</a>","<a>Supported Linux Distributions</a>","<a>Python</a>","<a>Package Manager</a>","<a>Installation</a>","<a>Anaconda</a>","<a>pip</a>","<a>Verification</a>","<a>Building from source</a>","<a>Prerequisites</a>","<a>Prerequisites</a>","<a>Supported Windows Distributions</a>","<a>Python</a>","<a>Package Manager</a>","<a>Installation</a>","<a>Anaconda</a>","<a>pip</a>","<a>Verification</a>","<a>Building from source</a>","<a>Prerequisites</a>","Start Locally","Select your preferences and run the install command. Stable represents the most currently tested and supported version of PyTorch. This should\n   be suitable for many users. Preview is available if you want the latest, not fully tested and supported, builds that are generated nightly.\n   Please ensure that you have<b>met the prerequisites below (e.g., numpy)</b>,  depending on your package manager. Anaconda is our recommended\n   package manager since it installs all dependencies. You can also<a>install previous versions of PyTorch</a>. Note that LibTorch is only available for C++.","<b>NOTE:</b>Latest PyTorch requires Python 3.8 or later.","PyTorch Build","Your OS","Package","Language","Compute Platform","Run this Command:","PyTorch Build","Stable (2.4.0)","Preview (Nightly)","Your OS","Linux","Mac","Windows","Package","Conda","Pip","LibTorch","Source","Language","Python","C++ / Java","Compute Platform","CUDA 11.8","CUDA 12.1","CUDA 12.4","ROCm 6.1","CPU","Run this Command:","pip3 install torch torchvision torchaudio --index-url https://download.pytorch.org/whl/cu118","","Installing on macOS","PyTorch can be installed and used on macOS. Depending on your system and GPU capabilities, your experience with PyTorch on a Mac may vary in terms of processing time.","Prerequisites","macOS Version","PyTorch is supported on macOS 10.15 (Catalina) or above.","Python","It is recommended that you use Python 3.8 - 3.11.\nYou can install Python either through the Anaconda\npackage manager (see<a>below</a>),<a>Homebrew</a>, or\nthe<a>Python website</a>.","In one of the upcoming PyTorch releases, support for Python 3.8 will be deprecated.","Package Manager","To install the PyTorch binaries, you will need to use one of two supported package managers:<a>Anaconda</a>or<a>pip</a>. Anaconda is the recommended package manager as it will provide you all of the PyTorch dependencies in one, sandboxed install, including Python.","Anaconda","To install Anaconda, you can<a>download graphical installer</a>or use the command-line installer. If you use the command-line installer, you can right-click on the installer link, select<code>Copy Link Address</code>, or use the following commands on Intel Mac:","<code>&lt;span&gt;# The version of Anaconda may be different depending on when you are installing`&lt;/span&gt;curl&lt;span&gt;-O&lt;/span&gt;https://repo.anaconda.com/miniconda/Miniconda3-latest-MacOSX-x86_64.sh<br>sh Miniconda3-latest-MacOSX-x86_64.sh&lt;span&gt;# and follow the prompts. The defaults are generally good.`&lt;/span&gt;</code>","or following commands on M1 Mac:","<code>&lt;span&gt;# The version of Anaconda may be different depending on when you are installing`&lt;/span&gt;curl&lt;span&gt;-O&lt;/span&gt;https://repo.anaconda.com/miniconda/Miniconda3-latest-MacOSX-arm64.sh<br>sh Miniconda3-latest-MacOSX-arm64.sh&lt;span&gt;# and follow the prompts. The defaults are generally good.`&lt;/span&gt;</code>","pip","<em>Python 3</em>","If you installed Python via Homebrew or the Python website,<code>pip</code>was installed with it. If you installed Python 3.x, then you will be using the command<code>pip3</code>.","Tip: If you want to use just the command<code>pip</code>, instead of<code>pip3</code>, you can symlink<code>pip</code>to the<code>pip3</code>binary.","Installation","Anaconda","To install PyTorch via Anaconda, use the following conda command:","<code>conda&lt;span&gt;install&lt;/span&gt;pytorch torchvision&lt;span&gt;-c&lt;/span&gt;pytorch</code>","pip","To install PyTorch via pip, use one of the following two commands, depending on your Python version:","<code>&lt;span&gt;# Python 3.x&lt;/span&gt;pip3&lt;span&gt;install&lt;/span&gt;torch torchvision</code>","Verification","To ensure that PyTorch was installed correctly, we can verify the installation by running sample PyTorch code. Here we will construct a randomly initialized tensor.","<code>&lt;span&gt;import&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;=&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;rand&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;5&lt;/span&gt;&lt;span&gt;,&lt;/span&gt;&lt;span&gt;3&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;&lt;span&gt;print&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;</code>","The output should be something similar to:","<code>tensor([[0.3380, 0.3845, 0.3217],<br>        [0.8337, 0.9050, 0.2650],<br>        [0.2979, 0.7141, 0.9069],<br>        [0.1449, 0.1132, 0.1375],<br>        [0.4675, 0.3947, 0.1426]])</code>","Building from source","For the majority of PyTorch users, installing from a pre-built binary via a package manager will provide the best experience. However, there are times when you may want to install the bleeding edge PyTorch code, whether for testing or actual development on the PyTorch core. To install the latest PyTorch code, you will need to<a>build PyTorch from source</a>.","Prerequisites","[Optional] Install<a>Anaconda</a>","Follow the steps described here:<a>https://github.com/pytorch/pytorch#from-source</a>","You can verify the installation as described<a>above</a>.","Installing on Linux","PyTorch can be installed and used on various Linux distributions. Depending on your system and compute requirements, your experience with PyTorch on Linux may vary in terms of processing time. It is recommended, but not required, that your Linux system has an NVIDIA or AMD GPU in order to harness the full power of PyTorch’s<a>CUDA</a><a>support</a>or<a>ROCm</a>support.","Prerequisites","Supported Linux Distributions","PyTorch is supported on Linux distributions that use<a>glibc</a>&gt;= v2.17, which include the following:","<a>Arch Linux</a>, minimum version 2012-07-15","<a>CentOS</a>, minimum version 7.3-1611","<a>Debian</a>, minimum version 8.0","<a>Fedora</a>, minimum version 24","<a>Mint</a>, minimum version 14","<a>OpenSUSE</a>, minimum version 42.1","<a>PCLinuxOS</a>, minimum version 2014.7","<a>Slackware</a>, minimum version 14.2","<a>Ubuntu</a>, minimum version 13.04","The install instructions here will generally apply to all supported Linux distributions. An example difference is that your distribution may support<code>yum</code>instead of<code>apt</code>. The specific examples shown were run on an Ubuntu 18.04 machine.","Python","Python 3.8-3.11 is generally installed by default on any of our supported Linux distributions, which meets our recommendation.","Tip: By default, you will have to use the command<code>python3</code>to run Python. If you want to use just the command<code>python</code>, instead of<code>python3</code>, you can symlink<code>python</code>to the<code>python3</code>binary.","However, if you want to install another version, there are multiple ways:","APT","<a>Python website</a>","If you decide to use APT, you can run the following command to install it:","<code>&lt;span&gt;sudo&lt;/span&gt;apt&lt;span&gt;install&lt;/span&gt;python</code>","If you use<a>Anaconda</a>to install PyTorch, it will install a sandboxed version of Python that will be used for running PyTorch applications.","Package Manager","To install the PyTorch binaries, you will need to use one of two supported package managers:<a>Anaconda</a>or<a>pip</a>. Anaconda is the recommended package manager as it will provide you all of the PyTorch dependencies in one, sandboxed install, including Python.","Anaconda","To install Anaconda, you will use the<a>command-line installer</a>. Right-click on the 64-bit installer link, select<code>Copy Link Location</code>, and then use the following commands:","<code>&lt;span&gt;# The version of Anaconda may be different depending on when you are installing`&lt;/span&gt;curl&lt;span&gt;-O&lt;/span&gt;https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh<br>sh Miniconda3-latest-Linux-x86_64.sh&lt;span&gt;# and follow the prompts. The defaults are generally good.`&lt;/span&gt;</code>","You may have to open a new terminal or re-source your<code>~/.bashrc</code>to get access to the<code>conda</code>command.","pip","<em>Python 3</em>","While Python 3.x is installed by default on Linux,<code>pip</code>is not installed by default.","<code>&lt;span&gt;sudo&lt;/span&gt;apt&lt;span&gt;install&lt;/span&gt;python3-pip</code>","Tip: If you want to use just the command<code>pip</code>, instead of<code>pip3</code>, you can symlink<code>pip</code>to the<code>pip3</code>binary.","Installation","Anaconda","No CUDA/ROCm","To install PyTorch via Anaconda, and do not have a<a>CUDA-capable</a>or<a>ROCm-capable</a>system or do not require CUDA/ROCm (i.e. GPU support), in the above selector, choose OS: Linux, Package: Conda, Language: Python and Compute Platform: CPU.\nThen, run the command that is presented to you.","With CUDA","To install PyTorch via Anaconda, and you do have a<a>CUDA-capable</a>system, in the above selector, choose OS: Linux, Package: Conda and the CUDA version suited to your machine. Often, the latest CUDA version is better.\nThen, run the command that is presented to you.","With ROCm","PyTorch via Anaconda is not supported on ROCm currently. Please use pip instead.","pip","No CUDA","To install PyTorch via pip, and do not have a<a>CUDA-capable</a>or<a>ROCm-capable</a>system or do not require CUDA/ROCm (i.e. GPU support), in the above selector, choose OS: Linux, Package: Pip, Language: Python and Compute Platform: CPU.\nThen, run the command that is presented to you.","With CUDA","To install PyTorch via pip, and do have a<a>CUDA-capable</a>system, in the above selector, choose OS: Linux, Package: Pip, Language: Python and the CUDA version suited to your machine. Often, the latest CUDA version is better.\nThen, run the command that is presented to you.","With ROCm","To install PyTorch via pip, and do have a<a>ROCm-capable</a>system, in the above selector, choose OS: Linux, Package: Pip, Language: Python and the ROCm version supported.\nThen, run the command that is presented to you.","Verification","To ensure that PyTorch was installed correctly, we can verify the installation by running sample PyTorch code. Here we will construct a randomly initialized tensor.","<code>&lt;span&gt;import&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;=&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;rand&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;5&lt;/span&gt;&lt;span&gt;,&lt;/span&gt;&lt;span&gt;3&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;&lt;span&gt;print&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;</code>","The output should be something similar to:","<code>tensor([[0.3380, 0.3845, 0.3217],<br>        [0.8337, 0.9050, 0.2650],<br>        [0.2979, 0.7141, 0.9069],<br>        [0.1449, 0.1132, 0.1375],<br>        [0.4675, 0.3947, 0.1426]])</code>","Additionally, to check if your GPU driver and CUDA/ROCm is enabled and accessible by PyTorch, run the following commands to return whether or not the GPU driver is enabled (the ROCm build of PyTorch uses the same semantics at the python API level<a>link</a>, so the below commands should also work for ROCm):","<code>&lt;span&gt;import&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;cuda&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;is_available&lt;/span&gt;&lt;span&gt;()&lt;/span&gt;</code>","Building from source","For the majority of PyTorch users, installing from a pre-built binary via a package manager will provide the best experience. However, there are times when you may want to install the bleeding edge PyTorch code, whether for testing or actual development on the PyTorch core. To install the latest PyTorch code, you will need to<a>build PyTorch from source</a>.","Prerequisites","Install<a>Anaconda</a>or<a>Pip</a>","If you need to build PyTorch with GPU support\na. for NVIDIA GPUs, install<a>CUDA</a>, if your machine has a<a>CUDA-enabled GPU</a>.\nb. for AMD GPUs, install<a>ROCm</a>, if your machine has a<a>ROCm-enabled GPU</a>","Follow the steps described here:<a>https://github.com/pytorch/pytorch#from-source</a>","You can verify the installation as described<a>above</a>.","Installing on Windows","PyTorch can be installed and used on various Windows distributions. Depending on your system and compute requirements, your experience with PyTorch on Windows may vary in terms of processing time. It is recommended, but not required, that your Windows system has an NVIDIA GPU in order to harness the full power of PyTorch’s<a>CUDA</a><a>support</a>.","Prerequisites","Supported Windows Distributions","PyTorch is supported on the following Windows distributions:","<a>Windows</a>7 and greater;<a>Windows 10</a>or greater recommended.","<a>Windows Server 2008</a>r2 and greater","The install instructions here will generally apply to all supported Windows distributions. The specific examples shown will be run on a Windows 10 Enterprise machine","Python","Currently, PyTorch on Windows only supports Python 3.8-3.11; Python 2.x is not supported.","As it is not installed by default on Windows, there are multiple ways to install Python:","<a>Chocolatey</a>","<a>Python website</a>","<a>Anaconda</a>","If you use Anaconda to install PyTorch, it will install a sandboxed version of Python that will be used for running PyTorch applications.","If you decide to use Chocolatey, and haven’t installed Chocolatey yet, ensure that you are running your command prompt as an administrator.","For a Chocolatey-based install, run the following command in an administrative command prompt:","<code>choco&lt;span&gt;install&lt;/span&gt;python</code>","Package Manager","To install the PyTorch binaries, you will need to use at least one of two supported package managers:<a>Anaconda</a>and<a>pip</a>. Anaconda is the recommended package manager as it will provide you all of the PyTorch dependencies in one, sandboxed install, including Python and<code>pip.</code>","Anaconda","To install Anaconda, you will use the<a>64-bit graphical installer</a>for PyTorch 3.x. Click on the installer link and select<code>Run</code>. Anaconda will download and the installer prompt will be presented to you. The default options are generally sane.","pip","If you installed Python by any of the recommended ways<a>above</a>,<a>pip</a>will have already been installed for you.","Installation","Anaconda","To install PyTorch with Anaconda, you will need to open an Anaconda prompt via<code>Start | Anaconda3 | Anaconda Prompt</code>.","No CUDA","To install PyTorch via Anaconda, and do not have a<a>CUDA-capable</a>system or do not require CUDA, in the above selector, choose OS: Windows, Package: Conda and CUDA: None.\nThen, run the command that is presented to you.","With CUDA","To install PyTorch via Anaconda, and you do have a<a>CUDA-capable</a>system, in the above selector, choose OS: Windows, Package: Conda and the CUDA version suited to your machine. Often, the latest CUDA version is better.\nThen, run the command that is presented to you.","pip","No CUDA","To install PyTorch via pip, and do not have a<a>CUDA-capable</a>system or do not require CUDA, in the above selector, choose OS: Windows, Package: Pip and CUDA: None.\nThen, run the command that is presented to you.","With CUDA","To install PyTorch via pip, and do have a<a>CUDA-capable</a>system, in the above selector, choose OS: Windows, Package: Pip and the CUDA version suited to your machine. Often, the latest CUDA version is better.\nThen, run the command that is presented to you.","Verification","To ensure that PyTorch was installed correctly, we can verify the installation by running sample PyTorch code. Here we will construct a randomly initialized tensor.","From the command line, type:","<code>python</code>","then enter the following code:","<code>&lt;span&gt;import&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;=&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;rand&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;5&lt;/span&gt;&lt;span&gt;,&lt;/span&gt;&lt;span&gt;3&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;&lt;span&gt;print&lt;/span&gt;&lt;span&gt;(&lt;/span&gt;&lt;span&gt;x&lt;/span&gt;&lt;span&gt;)&lt;/span&gt;</code>","The output should be something similar to:","<code>tensor([[0.3380, 0.3845, 0.3217],<br>        [0.8337, 0.9050, 0.2650],<br>        [0.2979, 0.7141, 0.9069],<br>        [0.1449, 0.1132, 0.1375],<br>        [0.4675, 0.3947, 0.1426]])</code>","Additionally, to check if your GPU driver and CUDA is enabled and accessible by PyTorch, run the following commands to return whether or not the CUDA driver is enabled:","<code>&lt;span&gt;import&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;torch&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;cuda&lt;/span&gt;&lt;span&gt;.&lt;/span&gt;&lt;span&gt;is_available&lt;/span&gt;&lt;span&gt;()&lt;/span&gt;</code>","Building from source","For the majority of PyTorch users, installing from a pre-built binary via a package manager will provide the best experience. However, there are times when you may want to install the bleeding edge PyTorch code, whether for testing or actual development on the PyTorch core. To install the latest PyTorch code, you will need to<a>build PyTorch from source</a>.","Prerequisites","Install<a>Anaconda</a>","Install<a>CUDA</a>, if your machine has a<a>CUDA-enabled GPU</a>.","If you want to build on Windows, Visual Studio with MSVC toolset, and NVTX are also needed. The exact requirements of those dependencies could be found out<a>here</a>.","Follow the steps described here:<a>https://github.com/pytorch/pytorch#from-source</a>","You can verify the installation as described<a>above</a>.","Docs","Access comprehensive developer documentation for PyTorch","View Docs","Tutorials","Get in-depth tutorials for beginners and advanced developers","View Tutorials","Resources","Find development resources and get your questions answered","View Resources","© Copyright The Linux Foundation. The PyTorch Foundation is a project of The Linux Foundation. \n          For web site terms of use, trademark policy and other policies applicable to The PyTorch Foundation please see<a>Linux Foundation Policies</a>. The PyTorch Foundation supports the PyTorch open source \n          project, which has been established as PyTorch Project a Series of LF Projects, LLC. For policies applicable to the PyTorch Project a Series of LF Projects, LLC, \n          please see<a>LF Projects, LLC Policies</a>.<a>Privacy Policy</a>and<a>Terms of Use</a>.","<a>Learn</a>","<a>Get Started</a>","<a>Tutorials</a>","<a>Learn the Basics</a>","<a>PyTorch Recipes</a>","<a>Introduction to PyTorch - YouTube Series</a>","<a>Ecosystem</a>","<a>Tools</a>","<a>Community</a>","<a>Forums</a>","<a>Developer Resources</a>","<a>Contributor Awards - 2023</a>","<a>Edge</a>","<a>About PyTorch Edge</a>","<a>ExecuTorch</a>","<a>Docs</a>","<a>PyTorch</a>","<a>PyTorch Domains</a>","<a>Blog &amp;amp; News</a>","<a>PyTorch Blog</a>","<a>Community Blog</a>","<a>Videos</a>","<a>Community Stories</a>","<a>Events</a>","<a>About</a>","<a>PyTorch Foundation</a>","<a>Governing Board</a>","<a>Become a Member</a>","To analyze traffic and optimize your experience, we serve cookies on this site. By clicking or navigating, you agree to allow our usage of cookies. As the current maintainers of this site, Facebook’s Cookies Policy applies. Learn more, including about available controls:<a>Cookies Policy</a>."],"language":"ko"}
 
@@ -0,0 +1,89 @@
+import math
+import os
+
+from divide_into_five import WordDict
+
+# 배치 한 개에 들어갈 수 있는 최대 문장 수
+MAX_BATCH_SIZE = int(os.getenv("TRANSLATE_MAX_BATCH_SIZE", "40"))
+# 배치 한 개의 입력/출력 토큰 예산 (프롬프트 고정 비용 제외)
+MAX_INPUT_TOKENS = int(os.getenv("TRANSLATE_MAX_INPUT_TOKENS", "1500"))
+MAX_OUTPUT_TOKENS = int(os.getenv("TRANSLATE_MAX_OUTPUT_TOKENS", "3000"))
+# 요청 하나가 동시에 LLM에 보낼 수 있는 최대 배치 수
+MAX_PARALLELISM = int(os.getenv("TRANSLATE_MAX_PARALLELISM", "8"))
+# 배치가 너무 잘게 쪼개져 프롬프트 비용만 늘어나지 않도록 하는 최소 예산
+MIN_BATCH_TOKENS = int(os.getenv("TRANSLATE_MIN_BATCH_TOKENS", "200"))
+
+# 출력 토큰 추정치 = 입력 토큰 * 배율 + 줄마다 붙는 번호/JSON 구문 비용
+OUTPUT_TOKEN_RATIO = 1.5
+PER_LINE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    # 토크나이저 없이 쓰는 대략적인 추정치
+    # 라틴 문자는 약 4글자당 1토큰, 한글/한자 등은 글자당 약 1토큰으로 계산
+    ascii_chars = 0
+    other_chars = 0
+    for ch in text:
+        if ord(ch) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+    return math.ceil(ascii_chars / 4) + other_chars
+
+
+def estimate_output_tokens(text):
+    return math.ceil(estimate_tokens(text) * OUTPUT_TOKEN_RATIO) + PER_LINE_OVERHEAD_TOKENS
+
+
+def plan_batches(
+    texts,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_input_tokens=MAX_INPUT_TOKENS,
+    max_output_tokens=MAX_OUTPUT_TOKENS,
+    max_parallelism=MAX_PARALLELISM,
+):
+    # 문자열 개수가 아니라 추정 토큰 수 기준으로 배치를 나눈다.
+    # 반환값은 WordDict 리스트이며, 각 WordDict의 키는 texts 안에서의 인덱스이다.
+    if not texts:
+        return []
+
+    input_costs = [estimate_tokens(text) + PER_LINE_OVERHEAD_TOKENS for text in texts]
+    output_costs = [estimate_output_tokens(text) for text in texts]
+
+    # 전체 분량을 병렬 슬롯 수만큼 고르게 나눈 값을 목표 예산으로 삼는다.
+    # 작은 페이지는 배치 수가 줄고, 큰 페이지는 최대 예산까지 배치 수가 늘어난다.
+    target_input = math.ceil(sum(input_costs) / max(1, max_parallelism))
+    input_budget = min(max_input_tokens, max(MIN_BATCH_TOKENS, target_input))
+
+    batches = []
+    start = 0
+    batch_input = 0
+    batch_output = 0
+    for i in range(len(texts)):
+        size = i - start
+        if size > 0 and (
+            size >= max_batch_size
+            or batch_input + input_costs[i] > input_budget
+            or batch_output + output_costs[i] > max_output_tokens
+        ):
+            batches.append(WordDict(texts[start:i], start=start))
+            start = i
+            batch_input = 0
+            batch_output = 0
+        batch_input += input_costs[i]
+        batch_output += output_costs[i]
+
+    batches.append(WordDict(texts[start:], start=start))
+    return batches
+
+
+if __name__ == "__main__":
+    words_list = [
+        "one", "two", "three", "four", "five",
+        "hello", "world", "apple", "banana",
+        "PyTorch can be installed and used on various Linux distributions. " * 20,
+        "cherry", "date", "elephant", "lion",
+    ]
+
+    for batch in plan_batches(words_list, max_parallelism=4):
+        print(batch)
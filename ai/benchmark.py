@@ -0,0 +1,658 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import async_call_LLM
+import metrics
+from async_call_LLM import SEGMENT_MAX_CHARS, TRANSLATION_MEMORY, create_translator, translate_bulk, translate_text, translate_text_stream, translator_registry
+from fake_llm import FakeTranslationLLM
+from prompts import OUTPUT_FORMATS
+from provider_pool import HEDGE_BUDGET, PROFILES, Provider, ProviderPool
+from rate_limit import RateLimiter
+from translation_store import TranslationStore
+
+# 가짜 LLM으로 번역 파이프라인의 처리량/지연을 재는 오프라인 벤치마크
+#   python benchmark.py                     # 모든 시나리오 실행 후 기준값과 비교
+#   python benchmark.py -s news_page        # 특정 시나리오만
+#   python benchmark.py -s news_page --update-baseline   # 바꾼 시나리오의 현재 결과만 기준값으로 저장
+#   python benchmark.py --prompt compact    # 모든 시나리오를 특정 프롬프트 모드로 (비용/품질 비교용)
+#   python benchmark.py --format lines      # 모든 시나리오를 특정 출력 형식으로 (json / lines 비교용)
+#   python benchmark.py --startup           # 시작 시간만 (예산을 넘으면 실패)
+
+# 가짜 LLM이 번역 앞에 붙이는 표시
+FAKE_TRANSLATION_MARK = "[번역] "
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# 시나리오마다 반복하는 횟수. 지표별 중앙값을 결과와 기준값으로 쓴다
+BENCH_RUNS = int(os.getenv("BENCH_RUNS", "3"))
+# 기준값 대비 허용 비율. 지연/처리량은 CPU 하나에서도 실행마다 30%쯤 흔들리므로 사용량 지표보다 넓게 잡는다
+COST_TOLERANCE = 0.25
+TIMING_TOLERANCE = 0.5
+# 지연 지표(ms)에 더해 주는 여유. 수십 ms짜리 지표는 스케줄링 지연만으로도 비율이 크게 바뀐다
+TIMING_SLACK_MS = 25
+# 요청 지연 표본이 이보다 적으면 p95/p99는 사실상 최댓값이므로 비교하지 않는다 (p50과 처리량만 본다)
+MIN_TAIL_SAMPLES = 20
+
+# 새 워커가 요청을 받기까지의 시간 예산(ms). 기준값과의 비교가 아니라 절대값이며, 넘으면 벤치마크가 실패한다
+#   server_import_ms: 프로세스 시작부터 server 모듈 임포트까지 (감독 프로세스가 내는 비용)
+#   ready_ms: 워밍업이 끝나 /readyz가 200을 줄 때까지
+#   first_translation_ms: 첫 /translate 응답까지
+STARTUP_BUDGET_MS = {"server_import_ms": 1000, "ready_ms": 3000, "first_translation_ms": 3500}
+STARTUP_RUNS = 3
+# 새 프로세스에서 실행해 시간을 잰다 (가짜 LLM을 쓰고 저장소는 끈다)
+STARTUP_SCRIPT = """
+import asyncio, json, os, time
+started_at = float(os.environ["BENCH_STARTED_AT"])
+import server
+server_imported_at = time.time()
+import benchmark
+benchmark.install_fake_llm()
+
+async def main():
+    await server.warmup()
+    assert server.state["status"] == "ready"
+    ready_at = time.time()
+    response = await server.app.test_client().post("/translate", json={"strs": ["Get Started"], "language": "ko"})
+    assert response.status_code == 200
+    return ready_at, time.time()
+
+ready_at, translated_at = asyncio.run(main())
+print(json.dumps({
+    "server_import_ms": (server_imported_at - started_at) * 1000,
+    "ready_ms": (ready_at - started_at) * 1000,
+    "first_translation_ms": (translated_at - started_at) * 1000,
+}))
+"""
+
+# 페이지를 만들 때 섞어 쓰는 문자열 (네이버/파이토치 페이지에서 가져온 유형)
+SHORT_UI = [
+    "검색", "다음", "이전", "LIVE", "NAVER", "입력도구", "자동완성/최근검색어펼치기",
+    "상단영역 바로가기", "서비스 메뉴 바로가기", "새소식 블록 바로가기", "쇼핑 블록 바로가기",
+    "뉴스스탠드", "언론사편집", "엔터", "스포츠", "경제", "쇼핑투데이", "연합뉴스", "네이버 클라우드",
+    "Learn", "Get Started", "Tutorials", "Ecosystem", "Community", "Forums", "Docs", "Events", "About",
+]
+SENTENCES = [
+    "Run PyTorch locally or get started quickly with one of the supported cloud platforms",
+    "Join the PyTorch developer community to contribute, learn, and get your questions answered.",
+    "PyTorch can be installed and used on macOS. Depending on your system and GPU capabilities, your experience with PyTorch on a Mac may vary in terms of processing time.",
+    "To ensure that PyTorch was installed correctly, we can verify the installation by running sample PyTorch code. Here we will construct a randomly initialized tensor.",
+    "The PyTorch Fully Sharded Data Parallel (FSDP) already has the capability to scale model training to a specific number of GPUs. However, when it comes to further scale the model training in terms of model size and GPU quantity, many additional challenges arise that may require combining Tensor Parallel with FSDP.",
+    "배드민턴협회, 진상조사위 구성…'부상 관리 소홀'엔 적극 반박",
+    "(베타) FX에서 합성곱/배치 정규화(Convolution/Batch Norm) 결합기(Fuser) 만들기",
+]
+MARKUP = [
+    "<a>Become a Member</a>",
+    "<span>Governing Board</span>",
+    "To install Anaconda, you can<a>download graphical installer</a>or use the command-line installer.",
+    "<b>NOTE:</b>Latest PyTorch requires Python 3.8 or later.",
+    "<a>배드민턴협회, 진상조사위 구성…'부상 관리 소홀'엔 적극 반박</a>",
+]
+# innerHTML에서 그대로 가져온, 속성이 붙은 마크업 ({w}에는 기사 제목 같은 문구가 들어간다)
+RICH_MARKUP = [
+    '<a href="https://pytorch.org/get-started/locally/" class="nav-link dropdown-toggle" data-toggle="dropdown">{w}</a>',
+    '<span class="blind">{w}</span>',
+    'To install {w}, you can <a href="https://www.anaconda.com/download/" target="_blank" rel="noopener">download graphical installer</a> or use the command-line installer.',
+    '<a href="https://n.news.naver.com/article/001/0014851234" class="cjs_news_a"><strong class="cjs_t">{w}</strong></a>',
+    'Latest {w} requires <code class="docutils literal notranslate"><span class="pre">Python</span></code> 3.8 or later.<br/>',
+    '<span class="MediaNewsView-module__subscribe___xv4Jz"><i class="icon-subscribe" aria-hidden="true"></i>{w}</span>',
+]
+VARIABLE = [
+    "댓글 {n}개",
+    "Join us in Silicon Valley September {n}-{m} at the 2024 PyTorch Conference.",
+    "{n}분 전",
+    "Contributor Awards - {y}",
+]
+# 기사 제목처럼 매번 다른 문자열을 만들 때 쓰는 단어
+HEADLINE_WORDS = [
+    "정부", "발표", "경제", "성장", "금리", "인상", "시장", "반응", "선수", "부상", "협회", "조사",
+    "model", "training", "GPU", "parallel", "release", "update", "cloud", "install", "tensor", "memory",
+]
+
+# page_size: 페이지당 문자열 수, pages: 페이지 수, concurrency: 동시에 보내는 페이지 수
+# llm: FakeTranslationLLM 옵션, endpoint: True면 /translate 엔드포인트를 거친다
+# prompt: 요청에 넣을 프롬프트 모드, format: 요청에 넣을 출력 형식 (없으면 서버 기본값)
+# stream: True면 translate_text_stream으로 받아 첫 레코드까지 걸린 시간도 잰다
+# language: 목표 언어 (기본값 en), languages: 여러 언어로 번역할 때 목표 언어 목록
+# bulk: True면 모든 페이지와 언어를 translate_bulk 한 번으로 보낸다 (False면 페이지 x 언어마다 요청)
+# markup: 속성이 붙은 마크업 문자열의 비율, compress_tags: 태그를 자리표시자로 바꿔 보낼지 (기본값 True)
+# cost_only: 재시도 대기(무작위)가 지연을 좌우하는 시나리오는 비용 지표만 기준값과 비교한다
+# selection: True면 페이지마다 사용자가 선택한 문구 하나(다른 페이지와 겹치지 않음)를 보낸다
+# priority: 요청에 넣을 우선순위 (없으면 요청 크기로 정한다)
+# background: {"page_size", "pages"} 측정하는 요청과 함께 큰 페이지 번역을 동시에 돌려 LLM 슬롯을 채운다
+#   (사용량과 비율 지표는 배경 작업과 섞이므로 결과에 넣지 않고 지연 지표만 본다)
+# llm_slots: 프로세스 전체의 LLM 동시 호출 수 (없으면 서버 기본값)
+# micro_batch_ms: 작은 요청을 다른 요청과 모으는 시간(ms) (없으면 서버 기본값)
+# variables: 숫자/날짜만 다른 문자열("댓글 12개")의 비율, memory: False면 템플릿 번역 메모리를 끈다
+# paragraphs: 여러 문장으로 된 긴 문단(튜토리얼/기사 본문)의 비율, segment_max_chars: 긴 문자열을 나누는 기준 (0이면 나누지 않음)
+# ungated: 출력은 하지만 기준값과 비교하지 않는 지표
+MICRO_BATCH_COST_METRICS = (
+    "llm_calls_per_page", "prompt_tokens_per_string", "prompt_overhead_per_string", "completion_tokens_per_string",
+)
+SCENARIOS = {
+    "popup": {"page_size": 1, "pages": 40, "concurrency": 20},
+    "widget": {"page_size": 15, "pages": 40, "concurrency": 20},
+    "news_page": {"page_size": 300, "pages": 8, "concurrency": 4},
+    "portal_5000": {"page_size": 5000, "pages": 2, "concurrency": 2},
+    "faulty_page": {
+        "page_size": 300, "pages": 8, "concurrency": 4,
+        "llm": {"error_rate": 0.05, "corruption_rate": 0.02}, "cost_only": True,
+    },
+    "endpoint_widget": {"page_size": 15, "pages": 40, "concurrency": 8, "endpoint": True},
+    "popup_auto_prompt": {"page_size": 1, "pages": 40, "concurrency": 20, "prompt": "auto"},
+    "news_page_auto_prompt": {"page_size": 300, "pages": 8, "concurrency": 4, "prompt": "auto"},
+    "news_page_lines": {"page_size": 300, "pages": 8, "concurrency": 4, "format": "lines"},
+    "news_page_stream": {"page_size": 300, "pages": 8, "concurrency": 4, "stream": True},
+    "news_page_stream_lines": {
+        "page_size": 300, "pages": 8, "concurrency": 4, "stream": True, "format": "lines",
+        "llm": {"runaway_rate": 0.1},
+    },
+    "news_page_ko": {"page_size": 300, "pages": 8, "concurrency": 4, "language": "한국어"},
+    "site_pages_two_languages": {"page_size": 15, "pages": 40, "concurrency": 20, "languages": ["en", "ja"]},
+    "site_bulk_two_languages": {"page_size": 15, "pages": 40, "languages": ["en", "ja"], "bulk": True},
+    "popup_under_page_load": {
+        "page_size": 1, "pages": 40, "concurrency": 4, "selection": True,
+        "background": {"page_size": 2000, "pages": 4}, "llm_slots": 4,
+    },
+    "popup_under_page_load_no_priority": {
+        "page_size": 1, "pages": 40, "concurrency": 4, "selection": True, "priority": "bulk",
+        "background": {"page_size": 2000, "pages": 4}, "llm_slots": 4,
+    },
+    # 몇 개의 요청이 한 묶음에 들어가는지는 타이밍에 달려 있으므로 호출 수와 토큰 지표는 출력만 하고 비교하지 않는다
+    "popup_micro_batch": {
+        "page_size": 1, "pages": 40, "concurrency": 20, "micro_batch_ms": 5, "ungated": MICRO_BATCH_COST_METRICS,
+    },
+    "widget_micro_batch": {
+        "page_size": 15, "pages": 40, "concurrency": 20, "micro_batch_ms": 5, "ungated": MICRO_BATCH_COST_METRICS,
+    },
+    "article_page": {
+        "page_size": 15, "pages": 24, "concurrency": 4, "paragraphs": 0.4, "language": "ko",
+        "llm": {"latency_per_token": 0.002},
+    },
+    "article_page_unsplit": {
+        "page_size": 15, "pages": 24, "concurrency": 4, "paragraphs": 0.4, "language": "ko", "segment_max_chars": 0,
+        "llm": {"latency_per_token": 0.002},
+    },
+    "comment_feed": {"page_size": 100, "pages": 16, "concurrency": 2, "variables": 0.6},
+    "comment_feed_no_memory": {"page_size": 100, "pages": 16, "concurrency": 2, "variables": 0.6, "memory": False},
+    # 공급자 지연 꼬리(호출 4%가 1초 더 걸림): 공급자 하나 / 두 공급자 사이 헤지
+    # 꼬리 지연 비율(4%)이 p95 경계 가까이 있어 가짜 LLM의 호출 p95는 약 0.1초와 1초 중 하나로 갈리므로 비교하지 않는다
+    "news_page_tail": {
+        "page_size": 300, "pages": 24, "concurrency": 4, "warmup_pages": 8, "llm": {"tail_rate": 0.04, "tail_latency": 1.0},
+        "ungated": ("llm_call_p95_ms",),
+    },
+    "news_page_hedged": {
+        "page_size": 300, "pages": 24, "concurrency": 4, "warmup_pages": 8, "ungated": ("llm_call_p95_ms",),
+        "providers": {
+            "primary": {"tail_rate": 0.04, "tail_latency": 1.0, "seed": 1},
+            "secondary": {"tail_rate": 0.04, "tail_latency": 1.0, "seed": 2},
+        },
+    },
+    # 영구 저장소: 처음 번역하며 쓰기(write-behind) 비용 / 재시작 후 저장소에서 읽기
+    "news_page_store": {"page_size": 300, "pages": 8, "concurrency": 4, "store": "cold"},
+    "news_page_restart": {"page_size": 300, "pages": 8, "concurrency": 4, "store": "warm"},
+    "markup_page": {"page_size": 300, "pages": 8, "concurrency": 4, "markup": 0.6},
+    "markup_page_raw_tags": {"page_size": 300, "pages": 8, "concurrency": 4, "markup": 0.6, "compress_tags": False},
+    "faulty_page_lines": {
+        "page_size": 300, "pages": 8, "concurrency": 4, "format": "lines",
+        "llm": {"error_rate": 0.05, "corruption_rate": 0.02}, "cost_only": True,
+    },
+}
+
+# 기준값 대비 허용 범위 (높을수록 나쁜 지표 / 낮을수록 나쁜 지표)
+HIGHER_IS_WORSE = (
+    "p50_ms", "p95_ms", "p99_ms", "llm_calls_per_page", "prompt_tokens_per_string", "prompt_overhead_per_string",
+    "completion_tokens_per_string", "first_record_p50_ms", "first_record_p95_ms", "llm_call_p95_ms",
+)
+LOWER_IS_WORSE = ("strings_per_second",)
+# 배경 작업과 함께 도는 시나리오에서 빼는 지표
+BACKGROUND_MIXED_METRICS = (
+    "llm_calls_per_page", "prompt_tokens_per_string", "prompt_overhead_per_string", "completion_tokens_per_string",
+    "parse_failure_rate", "skipped_ratio", "memory_ratio", "llm_call_p95_ms",
+)
+TAIL_METRICS = ("p95_ms", "p99_ms", "first_record_p95_ms")
+TIMING_METRICS = ("p50_ms", "p95_ms", "p99_ms", "strings_per_second", "first_record_p50_ms", "first_record_p95_ms")
+
+
+def make_page(size, seed, markup=0.0, paragraphs=0.0, variables=0.0):
+    rng = random.Random(seed)
+    page = []
+    for _ in range(size):
+        if variables and rng.random() < variables:
+            template = rng.choice(VARIABLE)
+            page.append(template.format(n=rng.randint(1, 999), m=rng.randint(1, 30), y=rng.randint(2015, 2025)))
+            continue
+        if paragraphs and rng.random() < paragraphs:
+            # 문장 3~8개짜리 문단. 기사마다 다르도록 제목 단어로 된 문장을 섞는다
+            sentences = rng.choices(SENTENCES[:5], k=rng.randint(2, 6))
+            sentences.insert(rng.randint(0, len(sentences)), " ".join(rng.choices(HEADLINE_WORDS, k=rng.randint(6, 14))) + ".")
+            page.append(" ".join(sentences))
+            continue
+        if markup and rng.random() < markup:
+            words = " ".join(rng.choices(HEADLINE_WORDS, k=rng.randint(2, 8)))
+            page.append(rng.choice(RICH_MARKUP).format(w=words))
+            continue
+        roll = rng.random()
+        if roll < 0.4:
+            page.append(rng.choice(SHORT_UI))
+        elif roll < 0.55:
+            page.append(rng.choice(SENTENCES))
+        elif roll < 0.65:
+            page.append(rng.choice(MARKUP))
+        elif roll < 0.8:
+            template = rng.choice(VARIABLE)
+            page.append(template.format(n=rng.randint(1, 999), m=rng.randint(1, 30), y=rng.randint(2015, 2025)))
+        else:
+            page.append(" ".join(rng.choices(HEADLINE_WORDS, k=rng.randint(4, 12))))
+    return page
+
+
+def make_selection(seed):
+    # 팝업으로 번역하는 선택 문구. 배경 페이지와 겹치지 않도록 번호를 붙인다
+    rng = random.Random(seed)
+    return f"{' '.join(rng.choices(HEADLINE_WORDS, k=rng.randint(3, 8)))} #{seed}"
+
+
+def install_fake_llm(**options):
+    # 번역기 레지스트리가 Gemini 대신 가짜 LLM을 쓰도록 바꾸고 공유 상태를 초기화한다
+    fake = FakeTranslationLLM(**options)
+    translator_registry.replace_factory(lambda **kwargs: create_translator(llm=fake, **kwargs))
+    async_call_LLM.translation_cache.clear()
+    async_call_LLM.translation_memory.clear()
+    # 워밍업이 만드는 LLM 클라이언트도 가짜 LLM으로
+    async_call_LLM.provider_pool = ProviderPool([Provider("llm", lambda _: fake)])
+    # 저장소는 시나리오가 켤 때만 임시 파일로 쓴다
+    async_call_LLM.translation_store = None
+    async_call_LLM.llm_limiter.set_limit(async_call_LLM.MAX_CONCURRENT_LLM_CALLS)
+    async_call_LLM.concurrency_controller.max_limit = async_call_LLM.MAX_CONCURRENT_LLM_CALLS
+    set_micro_batch_delay(float(os.getenv("TRANSLATE_MICRO_BATCH_DELAY_MS", "0")))
+    # 벤치마크에서는 할당량 대기가 결과를 흔들지 않도록 사실상 무제한으로 둔다
+    async_call_LLM.rate_limiter = RateLimiter(10 ** 9, 10 ** 12)
+    return fake
+
+
+class FakeProviders:
+    # 여러 가짜 공급자의 사용량을 합쳐 FakeTranslationLLM 하나처럼 읽는다
+    def __init__(self, fakes):
+        self.fakes = fakes
+
+    def __getattr__(self, name):
+        values = [getattr(fake, name) for fake in self.fakes]
+        return sum(values, type(values[0])())
+
+    def reset_stats(self):
+        for fake in self.fakes:
+            fake.reset_stats()
+
+
+def install_fake_providers(providers, hedge_budget=HEDGE_BUDGET):
+    # providers: {이름: {"profiles": [...], 가짜 LLM 옵션...}}. 가짜 LLM들을 공급자 풀로 묶어 번역기에 끼운다
+    install_fake_llm()
+    fakes = {
+        name: FakeTranslationLLM(**{option: value for option, value in options.items() if option != "profiles"})
+        for name, options in providers.items()
+    }
+    pool = ProviderPool(
+        [Provider(name, lambda _, llm=llm: llm, providers[name].get("profiles", PROFILES)) for name, llm in fakes.items()],
+        hedge_budget=hedge_budget, seed=0,
+    )
+    translator_registry.replace_factory(lambda **kwargs: create_translator(pool=pool, **kwargs))
+    async_call_LLM.provider_pool = pool
+    return FakeProviders(list(fakes.values())), pool
+
+
+def set_micro_batch_delay(delay_ms):
+    async_call_LLM.MICRO_BATCH_DELAY_MS = delay_ms
+    async_call_LLM.micro_batcher.max_delay = delay_ms / 1000
+
+
+def make_payload(page, language, prompt, output_format, priority=None):
+    payload = {"strs": page, "language": language}
+    if priority:
+        payload["priority"] = priority
+    if prompt:
+        payload["prompt"] = prompt
+    if output_format:
+        payload["output_format"] = output_format
+    return payload
+
+
+def check_page(page, translations):
+    # 가짜 LLM은 "[번역] 원문"을 돌려주므로(긴 문자열은 조각마다 붙는다) 표시를 지운 결과가 원문과 같아야 한다.
+    # 사전 필터나 실패로 원문이 그대로 온 경우도 통과한다. 순서가 밀리거나 자리표시자가 새거나 태그를 잃으면 실패한다
+    assert len(translations) == len(page), f"문자열 수가 다릅니다: {len(translations)} != {len(page)}"
+    # (가짜 LLM의 "quote" 손상은 번역 전체를 따옴표로 감쌀 뿐이라 검증이 잡지 않으므로 허용한다)
+    for i, (source, translation) in enumerate(zip(page, translations)):
+        unmarked = translation.replace(FAKE_TRANSLATION_MARK, "")
+        assert unmarked in (source, f'"{source}"'), f"{i}번 번역이 원문과 맞지 않습니다: {source!r} -> {translation!r}"
+
+
+async def run_direct(jobs, concurrency, prompt=None, output_format=None, stream=False, priority=None):
+    # jobs: [(페이지, 언어)]
+    # (요청별 지연, 요청별 첫 레코드까지의 지연)을 반환한다. 두 번째는 stream일 때만 채운다
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    first_records = []
+
+    async def run_page(page, language):
+        async with semaphore:
+            start = time.perf_counter()
+            payload = make_payload(page, language, prompt, output_format, priority)
+            if stream:
+                received = {}
+                async for record in translate_text_stream(payload):
+                    if "index" in record:
+                        if not received:
+                            first_records.append(time.perf_counter() - start)
+                        received[record["index"]] = record["translation"]
+                check_page(page, [received.get(i) or "" for i in range(len(page))])
+            else:
+                result = await translate_text(payload)
+                check_page(page, result["strs"])
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(run_page(page, language) for page, language in jobs))
+    return latencies, first_records
+
+
+async def with_background(measured, background, language, prompt=None, output_format=None):
+    # 큰 페이지 번역이 LLM 슬롯을 채운 상태에서 measured를 실행하고 그 결과를 반환한다
+    pages = [make_page(background["page_size"], seed=1000 + i) for i in range(background["pages"])]
+    jobs = [(page, language) for page in pages]
+    load = asyncio.ensure_future(run_direct(jobs, len(jobs), prompt, output_format, priority="bulk"))
+    await asyncio.sleep(0.2)
+    try:
+        return await measured
+    finally:
+        await load
+
+
+async def run_bulk(pages, languages, prompt=None, output_format=None):
+    # 모든 페이지와 언어를 한 번의 translate_bulk로 보낸다. 지연은 그 한 번의 시간
+    payload = {"documents": [{"id": i, "strs": page} for i, page in enumerate(pages)], "languages": languages}
+    if prompt:
+        payload["prompt"] = prompt
+    if output_format:
+        payload["output_format"] = output_format
+    start = time.perf_counter()
+    result = await translate_bulk(payload)
+    for i, page in enumerate(pages):
+        for language in languages:
+            check_page(page, result["results"][str(i)][language])
+    return [time.perf_counter() - start]
+
+
+async def run_endpoint(jobs, concurrency, prompt=None, output_format=None):
+    # 서버 시작/종료 훅까지 거치도록 test_app 안에서 /translate를 부른다
+    from server import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with app.test_app() as test_app:
+        client = test_app.test_client()
+
+        async def run_page(page, language):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/translate", json=make_payload(page, language, prompt, output_format))
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                check_page(page, (await response.get_json())["strs"])
+
+        await asyncio.gather(*(run_page(page, language) for page, language in jobs))
+    return latencies
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_scenario(name, spec, language="en", prompt=None, output_format=None):
+    pool = None
+    if "providers" in spec:
+        fake, pool = install_fake_providers(spec["providers"], spec.get("hedge_budget", HEDGE_BUDGET))
+    else:
+        fake = install_fake_llm(**spec.get("llm", {}))
+    async_call_LLM.COMPRESS_TAGS = spec.get("compress_tags", True)
+    async_call_LLM.SEGMENT_MAX_CHARS = spec.get("segment_max_chars", SEGMENT_MAX_CHARS)
+    async_call_LLM.TRANSLATION_MEMORY = spec.get("memory", TRANSLATION_MEMORY)
+    if "micro_batch_ms" in spec:
+        set_micro_batch_delay(spec["micro_batch_ms"])
+    if "llm_slots" in spec:
+        async_call_LLM.llm_limiter.set_limit(spec["llm_slots"])
+        async_call_LLM.concurrency_controller.max_limit = spec["llm_slots"]
+    if spec.get("selection"):
+        pages = [[make_selection(i)] for i in range(spec["pages"])]
+    else:
+        pages = [
+            make_page(
+                spec["page_size"], seed=i, markup=spec.get("markup", 0.0),
+                paragraphs=spec.get("paragraphs", 0.0), variables=spec.get("variables", 0.0),
+            )
+            for i in range(spec["pages"])
+        ]
+    languages = spec.get("languages", [spec.get("language", language)])
+    jobs = [(page, language) for page in pages for language in languages]
+    total_strings = sum(len(page) for page, _ in jobs)
+    prompt = prompt or spec.get("prompt")
+    output_format = output_format or spec.get("format") or async_call_LLM.DEFAULT_OUTPUT_FORMAT
+    parse_failures = metrics.PARSE_FAILURES.value(format=output_format)
+    if spec.get("warmup_pages"):
+        # 공급자 지연 통계가 쌓인 뒤(서비스가 이미 돌고 있던 상황)를 잰다. 캐시와 사용량은 비운다
+        warmup = [make_page(spec["page_size"], seed=1000 + i) for i in range(spec["warmup_pages"])]
+        asyncio.run(run_direct([(page, languages[0]) for page in warmup], spec["concurrency"], prompt, output_format))
+        async_call_LLM.translation_cache.clear()
+        async_call_LLM.translation_memory.clear()
+        fake.reset_stats()
+    hedges, pool_calls = (pool.hedges, pool.calls) if pool is not None else (0, 0)
+    store_directory = None
+    if spec.get("store"):
+        store_directory = tempfile.mkdtemp()
+        store = TranslationStore(os.path.join(store_directory, "translations.db"))
+        async_call_LLM.translation_store = store
+        if spec["store"] == "warm":
+            # 이전 프로세스가 같은 페이지를 번역해 저장소에 남기고 재시작한 상황 (프로세스 캐시와 메모리는 비어 있다)
+            asyncio.run(run_direct(jobs, spec["concurrency"], prompt, output_format))
+            store.flush()
+            fake = install_fake_llm(**spec.get("llm", {}))
+            async_call_LLM.translation_store = store
+    skipped = metrics.RESULTS.value(source="skipped")
+    remembered = metrics.RESULTS.value(source="memory")
+    stored = metrics.RESULTS.value(source="store")
+
+    start = time.perf_counter()
+    first_records = []
+    if spec.get("bulk"):
+        latencies = asyncio.run(run_bulk(pages, languages, prompt, output_format))
+    elif spec.get("endpoint"):
+        latencies = asyncio.run(run_endpoint(jobs, spec["concurrency"], prompt, output_format))
+    elif spec.get("background"):
+        measured = run_direct(jobs, spec["concurrency"], prompt, output_format, priority=spec.get("priority"))
+        latencies, first_records = asyncio.run(with_background(measured, spec["background"], languages[0], prompt, output_format))
+    else:
+        latencies, first_records = asyncio.run(
+            run_direct(jobs, spec["concurrency"], prompt, output_format, spec.get("stream", False), spec.get("priority"))
+        )
+    elapsed = time.perf_counter() - start
+    parse_failures = metrics.PARSE_FAILURES.value(format=output_format) - parse_failures
+    skipped = metrics.RESULTS.value(source="skipped") - skipped
+    remembered = metrics.RESULTS.value(source="memory") - remembered
+    stored = metrics.RESULTS.value(source="store") - stored
+    if store_directory is not None:
+        async_call_LLM.translation_store.close()
+        async_call_LLM.translation_store = None
+        shutil.rmtree(store_directory, ignore_errors=True)
+
+    result = {
+        # 지연 분위수를 계산한 요청 수
+        "samples": len(latencies),
+        "strings_per_second": round(total_strings / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "llm_calls_per_page": round(fake.calls / len(pages), 2),
+        "prompt_tokens_per_string": round(fake.prompt_tokens / total_strings, 1),
+        # 배치마다 반복되는 시스템 프롬프트가 문자열 하나당 차지하는 토큰 수
+        "prompt_overhead_per_string": round(fake.system_prompt_tokens / total_strings, 1),
+        "completion_tokens_per_string": round(fake.completion_tokens / total_strings, 1),
+        # 응답 전체를 읽지 못해 배치를 통째로 다시 보내야 했던 LLM 호출 비율
+        "parse_failure_rate": round(parse_failures / max(fake.calls, 1), 3),
+        # LLM에 보내지 않고 사전 필터에서 그대로 돌려준 문자열 비율
+        "skipped_ratio": round(skipped / total_strings, 3),
+        # 번역 메모리의 템플릿으로 LLM 없이 번역한 문자열 비율
+        "memory_ratio": round(remembered / total_strings, 3),
+    }
+    if pool is not None:
+        # 첫 공급자가 p95 안에 답하지 않아 다른 공급자에도 보낸 호출 비율
+        result["hedge_ratio"] = round((pool.hedges - hedges) / max(pool.calls - pool_calls, 1), 3)
+    if store_directory is not None:
+        # 영구 저장소에서 찾아 LLM에 보내지 않은 문자열 비율
+        result["store_ratio"] = round(stored / total_strings, 3)
+    if fake.call_seconds:
+        # 가짜 LLM이 흉내 낸 호출 지연 (배치가 고르게 나뉘었는지를 본다. 실제 시간이 아니라 흔들리지 않는다)
+        result["llm_call_p95_ms"] = round(percentile(fake.call_seconds, 95) * 1000, 1)
+    if spec.get("background"):
+        # 가짜 LLM 사용량과 결과 출처 카운터는 배경 페이지 번역까지 합친 값이라 측정하는 요청의 문자열 수로 나눌 수 없다
+        for metric in BACKGROUND_MIXED_METRICS:
+            result.pop(metric, None)
+    if first_records:
+        result["first_record_p50_ms"] = round(percentile(first_records, 50) * 1000, 1)
+        result["first_record_p95_ms"] = round(percentile(first_records, 95) * 1000, 1)
+    return result
+
+
+def measure_startup(runs=STARTUP_RUNS):
+    # 새 프로세스를 runs번 띄워 단계별 중앙값(ms)을 반환한다
+    samples = []
+    for _ in range(runs):
+        env = dict(os.environ, BENCH_STARTED_AT=repr(time.time()), TRANSLATE_STORE_PATH="")
+        completed = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, check=True,
+        )
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {metric: round(statistics.median(sample[metric] for sample in samples), 1) for metric in samples[0]}
+
+
+def check_startup(result, budget):
+    return [
+        f"startup.{metric}: {result[metric]} > {limit} (예산)"
+        for metric, limit in budget.items()
+        if metric in result and result[metric] > limit
+    ]
+
+
+def median_result(runs):
+    # 반복 실행 결과를 지표별 중앙값으로 합친다
+    return {metric: round(statistics.median(run[metric] for run in runs if metric in run), 3) for metric in runs[0]}
+
+
+def compare(name, result, baseline, tolerance, timing_tolerance, cost_only=False, ungated=()):
+    regressions = []
+    skipped = (TIMING_METRICS if cost_only else ()) + tuple(ungated)
+    if result.get("samples", MIN_TAIL_SAMPLES) < MIN_TAIL_SAMPLES:
+        skipped += TAIL_METRICS
+    for metric in HIGHER_IS_WORSE:
+        if metric in skipped or metric not in baseline or metric not in result:
+            continue
+        allowed = timing_tolerance if metric in TIMING_METRICS else tolerance
+        limit = baseline[metric] * (1 + allowed) + (TIMING_SLACK_MS if metric in TIMING_METRICS else 0)
+        if result[metric] > limit:
+            regressions.append(f"{name}.{metric}: {result[metric]} > {round(limit, 1)} (기준값 {baseline[metric]})")
+    for metric in LOWER_IS_WORSE:
+        if metric in skipped or metric not in baseline or metric not in result:
+            continue
+        allowed = timing_tolerance if metric in TIMING_METRICS else tolerance
+        limit = baseline[metric] * (1 - allowed)
+        if result[metric] < limit:
+            regressions.append(f"{name}.{metric}: {result[metric]} < {round(limit, 1)} (기준값 {baseline[metric]})")
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 LLM으로 번역 파이프라인 벤치마크")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="실행할 시나리오 (여러 번 지정 가능)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 파일 경로")
+    parser.add_argument("--update-baseline", action="store_true", help="-s로 지정한 시나리오의 현재 결과를 기준값으로 저장")
+    parser.add_argument("--prompt", help="모든 시나리오에 쓸 프롬프트 모드 (full, compact, minimal, auto)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="모든 시나리오에 쓸 출력 형식")
+    parser.add_argument("--tolerance", type=float, default=COST_TOLERANCE, help="사용량 지표의 기준값 대비 허용 비율")
+    parser.add_argument("--timing-tolerance", type=float, default=TIMING_TOLERANCE, help="지연/처리량 지표의 기준값 대비 허용 비율")
+    parser.add_argument("--runs", type=int, default=BENCH_RUNS, help="시나리오마다 반복 횟수 (지표별 중앙값을 쓴다)")
+    parser.add_argument("--startup", action="store_true", help="시작 시간만 잰다 (시나리오를 지정하지 않으면 항상 잰다)")
+    parser.add_argument(
+        "--startup-budget", action="append", default=[], metavar="METRIC=MS", help="시작 시간 예산 바꾸기 (예: ready_ms=3000)"
+    )
+    args = parser.parse_args(argv)
+    if args.update_baseline and not args.scenario:
+        # 전체를 다시 쓰면 건드리지 않은 시나리오의 기준값까지 그날의 흔들림으로 바뀐다
+        parser.error("--update-baseline은 바꾼 시나리오를 -s로 지정해서 쓰세요.")
+
+    names = args.scenario or ([] if args.startup else list(SCENARIOS))
+    baseline = load_baseline(args.baseline)
+    results = {}
+    regressions = []
+
+    if args.startup or not args.scenario:
+        budget = dict(STARTUP_BUDGET_MS)
+        for item in args.startup_budget:
+            metric, _, limit = item.partition("=")
+            budget[metric] = float(limit)
+        startup = measure_startup()
+        print(f"{'startup':22} " + "  ".join(f"{metric}={value}" for metric, value in startup.items()))
+        regressions.extend(check_startup(startup, budget))
+
+    for name in names:
+        result = median_result(
+            [run_scenario(name, SCENARIOS[name], prompt=args.prompt, output_format=args.format) for _ in range(max(args.runs, 1))]
+        )
+        results[name] = result
+        print(f"{name:22} " + "  ".join(f"{metric}={value}" for metric, value in result.items()))
+        # 프롬프트 모드나 출력 형식을 바꿔 돌린 결과는 기준값과 비교하지 않는다
+        if not args.update_baseline and not args.prompt and not args.format and name in baseline:
+            spec = SCENARIOS[name]
+            regressions.extend(
+                compare(
+                    name, result, baseline[name], args.tolerance, args.timing_tolerance,
+                    spec.get("cost_only", False), spec.get("ungated", ()),
+                )
+            )
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    if regressions:
+        print("성능 회귀:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
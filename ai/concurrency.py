@@ -0,0 +1,130 @@
+import asyncio
+import collections
+import contextlib
+import threading
+
+
+class ConcurrencyLimiter:
+    # 프로세스 전체에서 동시에 진행되는 LLM 호출 수를 제한하는 세마포어.
+    # 서버 워커는 이벤트 루프 하나를 계속 쓰지만, 이 객체는 모듈 전역이라 한 프로세스에서 asyncio.run을 여러 번 부르는
+    # 벤치마크와 명령행 도구에서는 루프가 바뀐 뒤에도 살아 있다. 처음 쓴 루프에 묶이는 asyncio.Semaphore 대신
+    # 스레드 안전한 카운터와 대기하는 쪽 루프의 Future로 구현한다.
+    #
+    # weights: {우선순위 클래스: 가중치}. 슬롯이 모자라면 클래스별 대기열에서 가중치 비율대로 슬롯을 나눠준다
+    # (stride 스케줄링). 가중치가 inf인 클래스는 대기 중인 요청이 있는 한 항상 먼저 슬롯을 받는다.
+    # 클래스를 지정하지 않은 호출은 마지막 클래스로 취급한다.
+    def __init__(self, limit, weights=None):
+        if limit < 1:
+            raise ValueError("limit은 1 이상이어야 합니다.")
+        weights = dict(weights or {"default": 1})
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("가중치는 0보다 커야 합니다.")
+        self._limit = limit
+        self._active = 0
+        self._weights = weights
+        self._default_priority = list(weights)[-1]
+        self._waiters = {priority: collections.deque() for priority in weights}
+        # 클래스별 누적 진행도와 마지막으로 슬롯을 받은 클래스의 진행도
+        self._passes = {priority: 0.0 for priority in weights}
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def waiting_by_priority(self):
+        return {priority: len(waiters) for priority, waiters in self._waiters.items()}
+
+    def set_limit(self, limit):
+        with self._lock:
+            self._limit = max(1, limit)
+            self._wake_locked()
+
+    async def acquire(self, priority=None):
+        priority = self._default_priority if priority is None else priority
+        if priority not in self._waiters:
+            raise ValueError(f"알 수 없는 우선순위입니다: {priority}")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self._limit and not self.waiting:
+                self._active += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            waiters = self._waiters[priority]
+            if not waiters:
+                # 한동안 비어 있던 클래스가 그동안 쌓인 몫을 한꺼번에 가져가지 않도록 현재 시점부터 센다
+                self._passes[priority] = max(self._passes[priority], self._virtual_time)
+            waiters.append(waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters[priority].remove(waiter)
+                    removed = True
+                except ValueError:
+                    removed = False
+            # 이미 슬롯을 받은 뒤에 취소되었다면 돌려준다
+            # (Future 자체가 취소된 경우에는 _grant가 돌려준다)
+            if not removed and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+            self._wake_locked()
+
+    def _next_priority_locked(self):
+        # 대기 중인 클래스 중 진행도가 가장 낮은 클래스. 같으면 먼저 선언된 클래스
+        candidates = [priority for priority, waiters in self._waiters.items() if waiters]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda priority: self._passes[priority])
+
+    def _wake_locked(self):
+        while self._active < self._limit:
+            priority = self._next_priority_locked()
+            if priority is None:
+                break
+            loop, future = self._waiters[priority].popleft()
+            self._virtual_time = self._passes[priority]
+            self._passes[priority] += 1 / self._weights[priority]
+            self._active += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                # 대기하던 요청의 이벤트 루프가 이미 닫힌 경우
+                self._active -= 1
+
+    def _grant(self, future):
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=None):
+        await self.acquire(priority)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
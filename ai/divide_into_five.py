@@ -1,6 +1,6 @@
 class WordDict:
-    def __init__(self, words):
-        self.word_dict = {i: word for i, word in enumerate(words)}  # 단어 리스트를 인덱스와 함께 사전 형태로 저장
+    def __init__(self, words, start=0):
+        self.word_dict = {i: word for i, word in enumerate(words, start)}  # 단어 리스트를 인덱스와 함께 사전 형태로 저장
         
     def to_dict(self):
         return self.word_dict
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from batch_planner import estimate_tokens
+from line_protocol import escape_text, unescape_text
+
+# 번역기가 보내는 "번호: 원문" 형식의 줄
+NUMBERED_LINE = re.compile(r"^(\d+): (.*)$", re.M)
+# 스트리밍할 때 한 번에 내보내는 글자 수
+STREAM_CHUNK_CHARS = 128
+
+
+class FakeTranslationLLM(BaseChatModel):
+    # 벤치마크용 가짜 LLM. 네트워크 없이 정해진 지연, 오류, 출력 손상을 흉내 낸다.
+    # 같은 seed면 같은 결과를 내므로 회귀 비교에 쓸 수 있다.
+    latency: float = 0.05  # 호출마다 고정 지연(초)
+    latency_per_token: float = 0.0002  # 출력 토큰 하나당 추가 지연(초)
+    jitter: float = 0.02  # 지연에 더해지는 ±범위(초)
+    error_rate: float = 0.0  # 호출 자체가 실패할 확률
+    throttle_rate: float = 0.0  # 429(할당량 초과)로 실패할 확률
+    # 항목 하나가 빠지거나, 태그가 깨지거나, 번호가 바뀌거나, 따옴표를 이스케이프하지 않을 확률
+    corruption_rate: float = 0.0
+    # 줄 형식으로 답을 다 쓴 뒤에도 멈추지 않고 같은 줄을 반복해서 더 생성할 확률
+    runaway_rate: float = 0.0
+    # 이 확률로 응답이 tail_latency초 더 늦어진다 (공급자의 지연 꼬리)
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+    seed: int = 0
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    system_prompt_tokens: int = 0  # prompt_tokens 중 시스템 프롬프트 몫
+    completion_tokens: int = 0
+    call_seconds: List[float] = []  # 스트리밍이 아닌 호출마다 흉내 낸 지연(초)
+
+    rng: Any = None
+
+    @property
+    def _llm_type(self):
+        return "fake-translation"
+
+    def reset_stats(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.system_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.call_seconds = []
+        self.rng = random.Random(self.seed)
+
+    def _random(self):
+        if self.rng is None:
+            self.rng = random.Random(self.seed)
+        return self.rng
+
+    def _tail(self):
+        # tail_rate가 0이면 난수를 뽑지 않아 다른 시나리오의 결과가 바뀌지 않는다
+        if self.tail_rate and self._random().random() < self.tail_rate:
+            return self.tail_latency
+        return 0.0
+
+    def _translate_line(self, text):
+        return f"[번역] {text}"
+
+    def _build_content(self, messages):
+        # 응답 본문과 프롬프트 토큰 수를 만든다. 호출 실패도 여기서 흉내 낸다
+        rng = self._random()
+        self.calls += 1
+        prompt = "\n".join(str(message.content) for message in messages)
+        prompt_tokens = estimate_tokens(prompt)
+        self.prompt_tokens += prompt_tokens
+        self.system_prompt_tokens += sum(
+            estimate_tokens(str(message.content)) for message in messages if message.type == "system"
+        )
+
+        if rng.random() < self.throttle_rate:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        if rng.random() < self.error_rate:
+            raise RuntimeError("fake LLM error")
+
+        # 시스템 프롬프트가 JSON을 요구하지 않으면 "번호: 번역" 줄로 답한다
+        lines_format = not any("JSON" in str(message.content) for message in messages if message.type == "system")
+
+        translations = {}
+        unescaped_quote = False
+        for index, text in NUMBERED_LINE.findall(str(messages[-1].content)):
+            translation = self._translate_line(unescape_text(text) if lines_format else text)
+            if rng.random() < self.corruption_rate:
+                corruption = rng.choice(["drop", "tags", "renumber", "quote"])
+                if corruption == "drop":
+                    continue
+                if corruption == "tags":
+                    translation = re.sub(r"</?[a-zA-Z][^>]*>", "", translation) + "</span>"
+                elif corruption == "renumber":
+                    index = str(int(index) + 1000)
+                else:
+                    translation = f'"{translation}"'
+                    unescaped_quote = True
+            translations[index] = translation
+
+        if lines_format:
+            content = "\n".join(f"{index}: {escape_text(text)}" for index, text in translations.items())
+        else:
+            content = json.dumps(translations, ensure_ascii=False)
+            if unescaped_quote:
+                # 모델이 번역문 안의 따옴표를 이스케이프하지 않으면 JSON 전체가 깨진다
+                content = content.replace('\\"', '"')
+        if lines_format and content and rng.random() < self.runaway_rate:
+            content = "\n".join([content] * 4)
+        return content, prompt_tokens
+
+    def _respond(self, messages):
+        content, prompt_tokens = self._build_content(messages)
+        completion_tokens = estimate_tokens(content)
+        self.completion_tokens += completion_tokens
+
+        delay = self.latency + completion_tokens * self.latency_per_token + self._random().uniform(-self.jitter, self.jitter) + self._tail()
+        self.call_seconds.append(max(0.0, delay))
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        return message, max(0.0, delay)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, delay = self._respond(messages)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # 첫 토큰까지 고정 지연을 기다린 뒤, 조각마다 토큰 수에 비례해 기다리며 내보낸다.
+        # 호출한 쪽이 중간에 멈추면 그때까지 내보낸 토큰만 completion_tokens에 더해진다.
+        content, prompt_tokens = self._build_content(messages)
+        await asyncio.sleep(max(0.0, self.latency + self._random().uniform(-self.jitter, self.jitter) + self._tail()))
+        completion_tokens = 0
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            piece = content[start:start + STREAM_CHUNK_CHARS]
+            tokens = estimate_tokens(piece)
+            await asyncio.sleep(tokens * self.latency_per_token)
+            completion_tokens += tokens
+            self.completion_tokens += tokens
+            usage = None
+            if start + STREAM_CHUNK_CHARS >= len(content):
+                usage = {
+                    "input_tokens": prompt_tokens,
+                    "output_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage))
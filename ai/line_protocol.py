@@ -0,0 +1,80 @@
+import re
+
+# JSON 대신 쓰는 줄 단위 출력 형식
+#   0: translated text 0
+#   1: translated text 1
+# 한 줄에 한 항목이므로 어떤 줄이 깨져도 나머지 줄은 그대로 살릴 수 있다.
+# 문장 안의 줄바꿈은 입력/출력 모두 "\n" 두 글자로, 원문의 역슬래시는 "\\" 두 글자로 바꿔서 주고받는다
+# (코드 조각 속 "\n" 글자가 줄바꿈으로 바뀌지 않도록).
+
+# "0: ...", "0. ...", "[0] ...", "0) ...", "0 - ..." 형태를 모두 받아준다
+LINE_PATTERN = re.compile(r"^\s*(?:\[(\d+)\]\s*[:.)|\-]?|(\d+)\s*[:.)|\-])\s?(.*?)\s*$")
+CODE_FENCE = re.compile(r"^\s*```")
+ESCAPE_PATTERN = re.compile(r"\\\\|\\n")
+
+
+def escape_text(text):
+    return text.replace("\\", "\\\\").replace("\r\n", "\n").replace("\n", "\\n")
+
+
+def unescape_text(text):
+    # 한 번에 훑어야 "\\n"(역슬래시 + n 글자)이 줄바꿈으로 읽히지 않는다
+    return ESCAPE_PATTERN.sub(lambda match: "\\" if match.group(0) == "\\\\" else "\n", text)
+
+
+def format_lines(texts):
+    # 번호를 붙여 한 줄에 하나씩 나열한다
+    return "\n".join(f"{i}: {escape_text(text)}" for i, text in enumerate(texts))
+
+
+def parse_line(line):
+    # 한 줄을 (번호, 번역)으로 읽는다. 형식에 맞지 않으면 None
+    if CODE_FENCE.match(line):
+        return None
+    match = LINE_PATTERN.match(line)
+    if match is None:
+        return None
+    return match.group(1) or match.group(2), unescape_text(match.group(3))
+
+
+class LineStreamParser:
+    # 스트리밍으로 들어오는 응답 조각을 받아 완성된 줄부터 (번호, 번역)으로 내놓는다.
+    # 같은 번호가 여러 번 나오면 처음 것을 쓴다.
+    def __init__(self):
+        self.translations = {}
+        self.malformed = 0
+        self._buffer = ""
+
+    def feed(self, text):
+        # 줄바꿈이 온 줄까지만 읽고 나머지는 다음 조각을 기다린다
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._parse(lines)
+
+    def close(self):
+        # 응답이 끝났으면 줄바꿈 없이 남은 마지막 줄도 읽는다
+        lines, self._buffer = [self._buffer], ""
+        return self._parse(lines)
+
+    def _parse(self, lines):
+        parsed = []
+        for line in lines:
+            if not line.strip():
+                continue
+            item = parse_line(line)
+            if item is None:
+                self.malformed += 1
+                continue
+            if item[0] in self.translations:
+                continue
+            self.translations[item[0]] = item[1]
+            parsed.append(item)
+        return parsed
+
+
+def parse_lines(text):
+    # 전체 응답을 읽어 ({번호: 번역}, 형식에 맞지 않은 줄 수)를 반환한다
+    parser = LineStreamParser()
+    parser.feed(text)
+    parser.close()
+    return parser.translations, parser.malformed
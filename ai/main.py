@@ -1,5 +1,28 @@
 from async_call_LLM import translate_text
+from line_protocol import escape_text, unescape_text
+import argparse
 import asyncio
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+
+# 큰 말뭉치(JSONL 또는 텍스트 파일)를 오프라인으로 번역하는 명령행 도구
+#   python main.py pages.jsonl -o pages.ko.jsonl -l Korean
+#   python main.py strings.txt -o strings.ja.txt -l Japanese -c 8
+# 입력은 한 줄씩 읽어서 chunk 단위로 translate_text에 보내고, 끝난 chunk는 입력 순서대로 바로 출력 파일에 쓴다.
+# chunk를 쓸 때마다 체크포인트(<출력>.checkpoint)를 남기므로 중단된 작업은 같은 명령으로 다시 실행하면 이어서 번역한다.
+# 입력 파일 없이 실행하면 아래 예시 문장을 번역해서 출력한다.
+#
+# JSONL 입력의 각 줄: {"strs": [...], "language"?: "..."} (다른 필드는 그대로 출력된다) 또는 문자열 하나
+# 텍스트 입력: 한 줄에 문자열 하나 (문장 안 줄바꿈은 "\n", 역슬래시는 "\\" 두 글자로 쓴다. 출력도 같다)
+
+# chunk 하나에 담을 최대 문자열 수 (JSONL 레코드는 나누지 않는다)
+CHUNK_STRINGS = int(os.getenv("TRANSLATE_CLI_CHUNK_STRINGS", "200"))
+# 동시에 번역할 chunk 수. 메모리에는 이 개수만큼의 chunk만 올라간다
+CONCURRENCY = int(os.getenv("TRANSLATE_CLI_CONCURRENCY", "4"))
 
 texts = [
     "When and Why you should apply Tensor Parallel",
@@ -16,11 +39,174 @@ texts = [
     "To demonstrate how to use the PyTorch native Tensor Parallel APIs, let us look at a common Transformer model. In this tutorial, we use the most recent Llama2 model as a reference Transformer model implementation, as it is also widely used in the community.",
     "Since Tensor Parallel shard individual tensors over a set of devices, we would need to set up the distributed environment (such as NCCL communicators) first. Tensor Parallelism is a Single-Program Multiple-Data (SPMD) sharding algorithm similar to PyTorch DDP/FSDP, and it under the hood leverages the PyTorch DTensor to perform sharding. It also utilizes the DeviceMesh abstraction (which under the hood manages ProcessGroups) for device management and sharding. To see how to utilize DeviceMesh to set up multi-dimensional parallelisms, please refer to this tutorial. Tensor Parallel usually works within each host, so let us first initialize a DeviceMesh that connects 8 GPUs within a host."
 ]
+
 target_language = "Korean"
 
-# 들어오는 형태 : dict
-input_dict = {"strs": texts, "language": target_language}
 
-text = asyncio.run(translate_text(input_dict))
+def read_records(path, input_format, default_language, skip):
+    # 입력을 한 줄씩 읽어 (원본 레코드, 문자열 목록, 언어)를 내놓는다. 앞의 skip개 레코드는 건너뛴다
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(source):
+            if line_number < skip:
+                continue
+            line = line.rstrip("\r\n")
+            if input_format == "text":
+                yield line, [unescape_text(line)], default_language
+                continue
+            if not line.strip():
+                yield None, [], default_language
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield record, [record], default_language
+            else:
+                yield record, record["strs"], record.get("language", default_language)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def format_record(record, translations, language, input_format):
+    if input_format == "text":
+        return escape_text(translations[0])
+    if record is None:
+        return ""
+    if isinstance(record, str):
+        return json.dumps(translations[0], ensure_ascii=False)
+    return json.dumps({**record, "strs": translations, "language": language}, ensure_ascii=False)
+
+
+def make_chunks(records, chunk_strings):
+    # 언어가 같은 연속된 레코드를 문자열 chunk_strings개 이하로 묶는다
+    chunk = []
+    size = 0
+    for record in records:
+        _, strs, language = record
+        if chunk and (size + len(strs) > chunk_strings or chunk[0][2] != language):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(record)
+        size += len(strs)
+    if chunk:
+        yield chunk
+
+
+async def translate_chunk(chunk, prompt):
+    texts = [text for _, strs, _ in chunk for text in strs]
+    if not texts:
+        return [[] for _ in chunk], 0
+    # 오프라인 작업이므로 팝업 같은 대화형 요청에 LLM 슬롯을 양보한다
+    input_dict = {"strs": texts, "language": chunk[0][2], "priority": "bulk"}
+    if prompt:
+        input_dict["prompt"] = prompt
+    result = await translate_text(input_dict)
+    translations = []
+    offset = 0
+    for _, strs, _ in chunk:
+        translations.append(result["strs"][offset:offset + len(strs)])
+        offset += len(strs)
+    return translations, result["skipped"]
+
+
+def load_checkpoint(path, args):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint["input"] != args.input or checkpoint["language"] != args.language:
+        raise ValueError(f"체크포인트 {path}가 다른 작업의 것입니다. --restart로 처음부터 다시 시작하세요.")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    # 쓰는 도중에 중단돼도 이전 체크포인트가 남도록 임시 파일에 쓰고 바꿔치기한다
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary_path, path)
+
+
+async def translate_file(args):
+    checkpoint_path = args.output + ".checkpoint"
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path, args)
+    if checkpoint is None:
+        checkpoint = {"input": args.input, "language": args.language, "records": 0, "offset": 0, "strings": 0, "skipped": 0}
+    elif checkpoint["records"]:
+        print(f"체크포인트에서 이어서 번역합니다: 레코드 {checkpoint['records']}개 완료", file=sys.stderr)
+
+    # 마지막 체크포인트 뒤에 쓰다 만 출력은 잘라낸다
+    output = open(args.output, "r+" if checkpoint["offset"] else "w", encoding="utf-8")
+    output.seek(checkpoint["offset"])
+    output.truncate()
+
+    records = read_records(args.input, args.input_format, args.language, checkpoint["records"])
+    pending = collections.deque()
+    started_at = time.perf_counter()
+
+    def write_chunk(chunk, translations, skipped):
+        for (record, _, language), strs in zip(chunk, translations):
+            output.write(format_record(record, strs, language, args.input_format) + "\n")
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint["records"] += len(chunk)
+        checkpoint["offset"] = output.tell()
+        checkpoint["strings"] += sum(len(strs) for strs in translations)
+        checkpoint["skipped"] += skipped
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    try:
+        # chunk를 최대 concurrency개까지 동시에 번역하고, 가장 앞의 chunk가 끝나는 대로 순서대로 쓴다
+        for chunk in make_chunks(records, args.chunk_strings):
+            pending.append((chunk, asyncio.ensure_future(translate_chunk(chunk, args.prompt))))
+            if len(pending) >= args.concurrency:
+                chunk, task = pending.popleft()
+                write_chunk(chunk, *await task)
+        while pending:
+            chunk, task = pending.popleft()
+            write_chunk(chunk, *await task)
+    finally:
+        for _, task in pending:
+            task.cancel()
+        output.close()
+
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"완료: 레코드 {checkpoint['records']}개, 문자열 {checkpoint['strings']}개 "
+        f"(사전 필터 {checkpoint['skipped']}개), 이번 실행 {elapsed:.1f}초",
+        file=sys.stderr,
+    )
+    # 입력이 비어 있으면 chunk를 하나도 쓰지 않아 체크포인트가 없다
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(checkpoint_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL/텍스트 파일을 이어서 번역할 수 있게 스트리밍으로 번역")
+    parser.add_argument("input", nargs="?", help="입력 파일 경로 (-는 표준 입력). 없으면 예시 문장을 번역")
+    parser.add_argument("-o", "--output", help="출력 파일 경로 (체크포인트는 <출력>.checkpoint)")
+    parser.add_argument("-l", "--language", default=target_language, help="목표 언어")
+    parser.add_argument("-f", "--input-format", choices=("jsonl", "text"), help="입력 형식 (기본값: 확장자가 .jsonl이면 jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help="동시에 번역할 chunk 수")
+    parser.add_argument("--chunk-strings", type=int, default=CHUNK_STRINGS, help="chunk 하나의 최대 문자열 수")
+    parser.add_argument("--prompt", help="프롬프트 모드 (full, compact, minimal, auto)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 번역")
+    args = parser.parse_args(argv)
+
+    if args.input is None:
+        text = asyncio.run(translate_text({"strs": texts, "language": args.language}))
+        print(text)
+        return 0
+    if args.output is None:
+        parser.error("입력 파일을 번역할 때는 --output이 필요합니다.")
+    if args.input == "-" and os.path.exists(args.output + ".checkpoint") and not args.restart:
+        parser.error("표준 입력은 이어서 번역할 수 없습니다. --restart를 쓰세요.")
+    if args.input_format is None:
+        args.input_format = "jsonl" if args.input.endswith(".jsonl") else "text"
+
+    asyncio.run(translate_file(args))
+    return 0
+
 
-print(text)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import itertools
+import re
+
+from validation import TAG_PATTERN
+
+# innerHTML에서 온 문자열의 태그(속성 포함)를 <x0>, </x0>, <x1/> 같은 짧은 자리표시자로 바꿔 LLM에 보내고,
+# 돌아온 번역에서 다시 원래 태그로 되돌린다. 자리표시자도 태그 모양이라 기존 태그 검증이 그대로 동작한다.
+PLACEHOLDER_PATTERN = re.compile(r"<\s*(/?)\s*x(\d+)\s*(/?)\s*>")
+
+
+def _placeholder(closing, number, self_closing):
+    return f"<{closing}x{number}{self_closing}>"
+
+
+def compress_tags(text):
+    # (자리표시자로 바꾼 문자열, {자리표시자: 원래 태그})를 반환한다.
+    # 여는 태그와 짝이 맞는 닫는 태그는 같은 번호를 쓴다 (<a href="...">...</a> -> <x0>...</x0>)
+    if "<" not in text or PLACEHOLDER_PATTERN.search(text):
+        # 원문에 이미 자리표시자 모양의 문자열이 있으면 되돌릴 때 헷갈리므로 바꾸지 않는다
+        return text, {}
+
+    tags = {}
+    open_tags = []  # (태그 이름, 번호)
+    numbers = itertools.count()
+
+    def replace(match):
+        closing, name, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+        number = None
+        if closing:
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i][0] == name:
+                    number = open_tags.pop(i)[1]
+                    break
+        if number is None:
+            number = next(numbers)
+            if not closing and not self_closing:
+                open_tags.append((name, number))
+        placeholder = _placeholder(closing, number, self_closing)
+        tags[placeholder] = match.group(0)
+        return placeholder
+
+    return TAG_PATTERN.sub(replace, text), tags
+
+
+def restore_tags(text, tags):
+    # 자리표시자를 원래 태그로 되돌린다.
+    # 모든 자리표시자가 정확히 한 번씩 쓰이지 않았으면 (빠짐, 중복, 모르는 번호) None
+    if not tags:
+        return text
+    used = []
+
+    def replace(match):
+        placeholder = _placeholder(*match.groups())
+        used.append(placeholder)
+        return tags.get(placeholder, match.group(0))
+
+    restored = PLACEHOLDER_PATTERN.sub(replace, text)
+    if sorted(used) != sorted(tags):
+        return None
+    return restored
+
+
+def split_segments(text):
+    # 문자열을 [(태그 여부, 조각)] 목록으로 나눈다. 조각을 이어 붙이면 원문이 된다
+    parts = []
+    position = 0
+    for match in TAG_PATTERN.finditer(text):
+        if match.start() > position:
+            parts.append((False, text[position:match.start()]))
+        parts.append((True, match.group(0)))
+        position = match.end()
+    if position < len(text):
+        parts.append((False, text[position:]))
+    return parts
+
+
+def join_segments(parts, translations):
+    # translations: {조각 인덱스: 번역}. 앞뒤 공백은 원문 조각의 것을 유지한다.
+    # 번역할 조각 중 하나라도 빠져 있으면 None
+    pieces = []
+    for i, (is_tag, part) in enumerate(parts):
+        if is_tag or not part.strip():
+            pieces.append(part)
+            continue
+        if i not in translations:
+            return None
+        leading = part[:len(part) - len(part.lstrip())]
+        trailing = part[len(part.rstrip()):]
+        pieces.append(leading + translations[i] + trailing)
+    return "".join(pieces)
@@ -0,0 +1,240 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus 텍스트 형식으로 내보내는 간단한 메트릭 모음 (외부 라이브러리 없이)
+
+# 단계별 소요 시간(초) 버킷
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 토큰 수 / 배치 크기 버킷
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 40, 80, 160, 320, 640, 1280, 5000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(name, "") for name in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    # 값을 직접 set 하거나, 수집 시점에 function을 불러 값을 읽는다.
+    # 레이블이 있으면 function은 {레이블 값: 값}을 반환한다
+    def __init__(self, name, help, labelnames=(), function=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if self.function is not None:
+            if not self.labelnames:
+                lines.append(f"{self.name} {_format_value(self.function())}")
+                return lines
+            for key, value in sorted(self.function().items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+            return lines
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=(), function=None):
+        return self._register(Gauge(name, help, labelnames, function))
+
+    def histogram(self, name, help, buckets, labelnames=()):
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 번역 파이프라인 메트릭
+STAGE_SECONDS = registry.histogram(
+    "translate_stage_seconds",
+    "Time spent in each translation stage (prefilter, split, store, format, queue, llm, parse, reassemble)",
+    SECONDS_BUCKETS,
+    ("stage",),
+)
+REQUEST_SECONDS = registry.histogram(
+    "translate_request_seconds", "End-to-end translate_text duration, by priority class", SECONDS_BUCKETS, ("priority",)
+)
+LLM_WAIT_SECONDS = registry.histogram(
+    "translate_llm_wait_seconds", "Time an LLM call waited for rate limits and a concurrency slot, by priority class",
+    SECONDS_BUCKETS, ("priority",)
+)
+STARTUP_SECONDS = registry.gauge(
+    "translate_startup_seconds", "Time spent in each worker warmup phase (import, translators, first_call)", ("phase",)
+)
+REQUEST_STRINGS = registry.histogram(
+    "translate_request_strings", "Number of strings per translate request", SIZE_BUCKETS
+)
+BATCH_SIZE = registry.histogram(
+    "translate_batch_size", "Number of strings sent in one LLM call", SIZE_BUCKETS
+)
+SPLIT_PIECES = registry.histogram(
+    "translate_split_pieces", "Sentence-level pieces per long string split before batching", SIZE_BUCKETS
+)
+MICRO_BATCH_REQUESTS = registry.histogram(
+    "translate_micro_batch_requests", "Small requests merged into one LLM call by the micro-batcher", SIZE_BUCKETS
+)
+MICRO_BATCH_WAIT_SECONDS = registry.histogram(
+    "translate_micro_batch_wait_seconds", "Time from the first request joining a micro-batch until it is sent", SECONDS_BUCKETS
+)
+LLM_TOKENS = registry.histogram(
+    "translate_llm_tokens", "Tokens per LLM call", TOKEN_BUCKETS, ("direction",)
+)
+LLM_CALLS = registry.counter(
+    "translate_llm_calls_total", "LLM calls by outcome", ("outcome",)
+)
+PROVIDER_CALLS = registry.counter(
+    "translate_provider_calls_total", "LLM calls by provider and outcome (ok, error, cancelled)", ("provider", "outcome")
+)
+PROVIDER_SECONDS = registry.histogram(
+    "translate_provider_seconds", "Duration of successful LLM calls, by provider", SECONDS_BUCKETS, ("provider",)
+)
+HEDGES = registry.counter(
+    "translate_llm_hedges_total", "Duplicate LLM calls sent to a second provider after the first passed its p95, by outcome (won, lost, failed)",
+    ("outcome",),
+)
+RETRIES = registry.counter(
+    "translate_retried_strings_total", "Strings re-requested after a missing or malformed result"
+)
+PARSE_FAILURES = registry.counter(
+    "translate_parse_failures_total", "LLM responses that could not be parsed at all, by output format", ("format",)
+)
+MALFORMED_LINES = registry.counter(
+    "translate_malformed_lines_total", "Lines skipped by the line-format parser"
+)
+FIRST_LINE_SECONDS = registry.histogram(
+    "translate_llm_first_line_seconds", "Time from the start of a streamed LLM call to its first parsed line", SECONDS_BUCKETS
+)
+EARLY_STOPS = registry.counter(
+    "translate_llm_early_stops_total", "Streamed LLM calls stopped once every expected line had arrived"
+)
+MARKUP_CHARS = registry.counter(
+    "translate_markup_chars_total", "Characters of markup before and after replacing tags with placeholders", ("stage",)
+)
+SEGMENT_FALLBACKS = registry.counter(
+    "translate_segment_fallbacks_total", "Strings re-translated segment by segment after their tags broke", ("outcome",)
+)
+PREFILTER_SKIPS = registry.counter(
+    "translate_prefilter_skips_total", "Strings returned unchanged without an LLM call, by reason", ("reason",)
+)
+RESULTS = registry.counter(
+    "translate_strings_total", "Translated strings by source (skipped, cache, store, memory, llm, fallback)", ("source",)
+)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from batch_planner import estimate_tokens
+import metrics
+
+
+class MicroBatcher:
+    # 문자열 몇 개짜리 요청(팝업 선택 문장, 지연 로딩 위젯 등)이 각자 시스템 프롬프트를 붙여 LLM을 부르지 않도록
+    # 같은 그룹(목표 언어, 프롬프트, 출력 형식)의 작은 배치를 max_delay초 동안 모아 한 번에 보내고 결과를 나눠준다.
+    # 모은 입력 토큰이나 문자열 수가 한도에 닿으면 기다리지 않고 바로 보낸다.
+    #
+    # send(group, texts, on_item, priority): texts는 {번호: 문자열}, 반환값은 {번호: 번역}
+    def __init__(self, send, max_delay, max_input_tokens, max_strings):
+        self._send = send
+        self.max_delay = max_delay
+        self.max_input_tokens = max_input_tokens
+        self.max_strings = max_strings
+        # (이벤트 루프, 그룹) -> 모으는 중인 배치. 서버 워커의 루프는 하나지만, asyncio.run을 여러 번 부르는
+        # 벤치마크에서 다른 루프의 배치와 섞이지 않도록 루프별로 모은다
+        self._pending = {}
+        # 보내는 중인 묶음 작업. 참조를 들고 있어야 도중에 가비지 컬렉션되지 않는다
+        self._tasks = set()
+
+    async def submit(self, group, texts, on_item=None, priority=None):
+        # texts: {key: 문자열}. 이 요청 몫의 번역을 {key: 번역}으로 반환하고,
+        # 항목이 확정될 때마다 on_item(key, 번역)을 부른다
+        loop = asyncio.get_running_loop()
+        pending_key = (loop, group)
+        tokens = sum(estimate_tokens(text) for text in texts.values())
+
+        pending = self._pending.get(pending_key)
+        if pending is not None and (
+            pending["tokens"] + tokens > self.max_input_tokens or len(pending["texts"]) + len(texts) > self.max_strings
+        ):
+            self._flush(pending_key)
+            pending = None
+        if pending is None:
+            pending = {
+                "group": group, "texts": {}, "routes": [], "callers": [], "tokens": 0, "priority": priority,
+                "started_at": time.perf_counter(), "timer": loop.call_later(self.max_delay, self._flush, pending_key),
+            }
+            self._pending[pending_key] = pending
+
+        future = loop.create_future()
+        caller = (texts, on_item, future, {})
+        pending["callers"].append(caller)
+        for key, text in texts.items():
+            pending["routes"].append((caller, key))
+            pending["texts"][len(pending["texts"])] = text
+        pending["tokens"] += tokens
+        # 한 요청이라도 interactive면 묶음 전체를 그 우선순위로 보낸다
+        if priority == "interactive":
+            pending["priority"] = priority
+
+        if pending["tokens"] >= self.max_input_tokens or len(pending["texts"]) >= self.max_strings:
+            self._flush(pending_key)
+        # 요청 하나가 취소되어도 함께 묶인 다른 요청의 LLM 호출은 계속된다
+        return await asyncio.shield(future)
+
+    def _flush(self, pending_key):
+        pending = self._pending.pop(pending_key, None)
+        if pending is None:
+            return
+        pending["timer"].cancel()
+        metrics.MICRO_BATCH_WAIT_SECONDS.observe(time.perf_counter() - pending["started_at"])
+        metrics.MICRO_BATCH_REQUESTS.observe(len(pending["callers"]))
+        task = asyncio.ensure_future(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"묶음 번역 작업 실패: {task.exception()!r}")
+
+    async def _run(self, pending):
+        routes = pending["routes"]
+
+        def on_item(i, value):
+            (_, caller_on_item, _, results), key = routes[i]
+            results[key] = value
+            if caller_on_item is not None:
+                caller_on_item(key, value)
+
+        try:
+            translated = await self._send(pending["group"], pending["texts"], on_item, pending["priority"])
+        except Exception as e:
+            for _, _, future, _ in pending["callers"]:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for i, value in translated.items():
+            (_, _, _, results), key = routes[i]
+            results[key] = value
+        for _, _, future, results in pending["callers"]:
+            if not future.done():
+                future.set_result(results)
@@ -0,0 +1,145 @@
+import os
+import re
+
+from validation import TAG_PATTERN
+
+# LLM에 보내지 않고 원문 그대로 돌려줄 문자열을 고른다.
+# 숫자/날짜, URL, 기호, 코드 식별자, 브랜드 이름, 이미 목표 언어로 쓰인 문자열이 대상이다.
+
+# 번역하지 않는 브랜드/서비스 이름. TRANSLATE_BRAND_TOKENS(쉼표 구분)로 더할 수 있다
+BRAND_TOKENS = {
+    "NAVER", "LIVE", "Google", "YouTube", "GitHub", "PyTorch", "Python", "Anaconda", "NVIDIA", "CUDA",
+    "Gemini", "Chrome", "iOS", "Android", "macOS", "Windows", "Linux",
+} | {token.strip() for token in os.getenv("TRANSLATE_BRAND_TOKENS", "").split(",") if token.strip()}
+# 이미 목표 언어라고 판단할 때 필요한 목표 문자(script)의 비율
+SCRIPT_RATIO = float(os.getenv("TRANSLATE_PREFILTER_SCRIPT_RATIO", "0.9"))
+# 라틴 문자 언어끼리 구분할 때 필요한 최소 기능어 수
+MIN_STOPWORD_HITS = 2
+
+URL_PATTERN = re.compile(
+    r"^(?:(?:https?|ftp)://\S+|www\.\S+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+|[\w-]+(?:\.[\w-]+)*\.[a-zA-Z]{2,}/\S*)$"
+)
+CODE_PATTERNS = [
+    re.compile(r"[A-Za-z0-9]_[A-Za-z0-9]"),  # snake_case
+    re.compile(r"^\S+\(\)$"),  # foo()
+    re.compile(r"^[a-z]+[A-Z][A-Za-z0-9]*$"),  # camelCase
+    re.compile(r"^[A-Z][a-z0-9]+[A-Z][A-Za-z0-9]*$"),  # PascalCase (YouTube, GitHub)
+    re.compile(r"^--?[a-z][\w-]*$"),  # --flag
+    re.compile(r"^(?:\.{0,2}/|~/)\S+$"),  # 경로
+]
+DOTTED_NAME = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+$")  # torch.nn.Linear, Node.js
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+# 문자(script)별 코드 포인트 범위
+SCRIPT_RANGES = {
+    "hangul": ((0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)),
+    "kana": ((0x3040, 0x30FF), (0x31F0, 0x31FF), (0xFF66, 0xFF9F)),
+    "han": ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF)),
+    "cyrillic": ((0x0400, 0x04FF),),
+    "arabic": ((0x0600, 0x06FF), (0x0750, 0x077F)),
+    "devanagari": ((0x0900, 0x097F),),
+    "thai": ((0x0E00, 0x0E7F),),
+    "latin": ((0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x024F)),
+}
+# 문자마다 파이썬으로 범위를 확인하면 긴 페이지에서 느리므로 정규식 문자 클래스로 센다
+SCRIPT_PATTERNS = {
+    script: re.compile("[" + "".join(f"\\u{start:04x}-\\u{end:04x}" for start, end in ranges) + "]")
+    for script, ranges in SCRIPT_RANGES.items()
+}
+
+# 언어 코드 -> (요청에 올 수 있는 이름들, 문자, 기능어)
+LANGUAGES = {
+    "ko": ({"ko", "kor", "korean", "한국어"}, "hangul", None),
+    "ja": ({"ja", "jpn", "japanese", "日本語"}, "kana", None),
+    "zh": ({"zh", "chinese", "中文", "简体中文", "繁體中文"}, "han", None),
+    "ru": ({"ru", "russian", "русский"}, "cyrillic", None),
+    "ar": ({"ar", "arabic", "العربية"}, "arabic", None),
+    "hi": ({"hi", "hindi", "हिन्दी"}, "devanagari", None),
+    "th": ({"th", "thai", "ไทย"}, "thai", None),
+    "en": ({"en", "eng", "english"}, "latin", {
+        "the", "and", "of", "to", "in", "is", "for", "with", "on", "that", "this", "you", "are", "your",
+        "it", "or", "as", "by", "from", "can", "will", "be", "an", "we",
+    }),
+    "fr": ({"fr", "french", "français", "francais"}, "latin", {
+        "le", "les", "et", "des", "du", "une", "est", "pour", "dans", "qui", "sur", "avec", "vous", "pas",
+        "au", "ce", "nous", "sont", "il", "elle",
+    }),
+    "es": ({"es", "spanish", "español", "espanol"}, "latin", {
+        "el", "los", "las", "y", "del", "que", "una", "es", "por", "para", "con", "se", "su", "al", "como",
+        "usted", "pero", "está", "son", "lo",
+    }),
+    "de": ({"de", "german", "deutsch"}, "latin", {
+        "der", "die", "das", "und", "ist", "nicht", "mit", "den", "zu", "ein", "eine", "für", "auf", "sie",
+        "dem", "von", "sich", "auch", "wir", "ich",
+    }),
+}
+LANGUAGE_ALIASES = {alias: code for code, (aliases, _, _) in LANGUAGES.items() for alias in aliases}
+
+
+def language_code(language):
+    # "Korean", "한국어", "ko-KR" 같은 값을 "ko"로 바꾼다. 모르는 언어면 None
+    name = language.strip().lower()
+    return LANGUAGE_ALIASES.get(name) or LANGUAGE_ALIASES.get(re.split(r"[-_]", name)[0])
+
+
+def count_script(text, script):
+    return len(SCRIPT_PATTERNS[script].findall(text))
+
+
+def is_target_language(text, code):
+    # 문자 비율로 판단하고, 같은 라틴 문자를 쓰는 언어끼리는 기능어 수로 가른다.
+    # 확신할 수 없으면 False (LLM에 보낸다)
+    _, script, stopwords = LANGUAGES[code]
+    if not SCRIPT_PATTERNS[script].search(text):
+        return False
+    letters = len(LETTER_PATTERN.findall(text))
+
+    if script == "kana":
+        # 일본어는 가나가 있어야 중국어와 구분된다
+        return count_script(text, "kana") + count_script(text, "han") >= letters * SCRIPT_RATIO
+    if script == "han":
+        return not SCRIPT_PATTERNS["kana"].search(text) and count_script(text, "han") >= letters * SCRIPT_RATIO
+    if count_script(text, script) < letters * SCRIPT_RATIO:
+        return False
+    if stopwords is None:
+        return True
+
+    words = [word.lower() for word in WORD_PATTERN.findall(text)]
+    hits = {other: sum(word in LANGUAGES[other][2] for word in words) for other in LANGUAGES if LANGUAGES[other][2]}
+    best_other = max((count for other, count in hits.items() if other != code), default=0)
+    return hits[code] >= MIN_STOPWORD_HITS and hits[code] > best_other
+
+
+def is_code(token):
+    if any(pattern.search(token) for pattern in CODE_PATTERNS):
+        return True
+    # U.S. 같은 약어는 빼고, 한 글자보다 긴 이름이 점으로 이어진 경우만 코드로 본다
+    return bool(DOTTED_NAME.match(token)) and any(len(part) > 1 for part in token.split("."))
+
+
+def skip_reason(text, target_language):
+    # 번역하지 않아도 되면 그 이유를, 아니면 None을 반환한다
+    stripped = text.strip()
+    if not stripped:
+        return "empty"
+    plain = TAG_PATTERN.sub(" ", stripped).strip()
+    if not plain:
+        return "markup"
+    if not any(char.isalpha() for char in plain):
+        # 숫자, 날짜, 시간, 가격, 기호
+        return "number" if any(char.isdigit() for char in plain) else "punctuation"
+    if URL_PATTERN.match(plain):
+        return "url"
+    tokens = plain.split()
+    # "NAVER LIVE", "Python 3.8"처럼 브랜드 이름과 숫자로만 이루어진 경우
+    if any(token in BRAND_TOKENS for token in tokens) and all(
+        token in BRAND_TOKENS or not any(char.isalpha() for char in token) for token in tokens
+    ):
+        return "brand"
+    if len(tokens) == 1 and is_code(plain):
+        return "code"
+    code = language_code(target_language)
+    if code is not None and is_target_language(plain, code):
+        return "target_language"
+    return None
@@ -0,0 +1,148 @@
+from batch_planner import estimate_tokens
+
+# 버전이 붙은 시스템 프롬프트 모음
+#   full    : 자세한 지시 + few-shot 예시 6개 (기존 프롬프트)
+#   compact : 핵심 지시 + 짧은 예시
+#   minimal : 출력 형식만 지시
+# 프롬프트 문구를 바꾸면 해당 항목의 버전을 올린다 (번역기 레지스트리와 캐시 키에 쓰임)
+# 출력 형식(json / lines)에 따른 지시는 [[format_instructions]] 자리에 들어간다
+
+FULL_PROMPT = """
+    You are a professional translator.
+    Translate the following numbered phrases into {target_language}.
+    [[format_instructions]]
+    Each phrase must be translated exactly as it is provided, without any additional interpretation, context, or meaning.
+    Your translation should be literal, preserving the exact words and structure of the original text.
+    Do not change the meaning of the phrases, infer additional information, or attempt to create a context.
+    Translate only what is explicitly written.
+    These phrases are independent of each other, so treat each one as a standalone translation.
+    Only use parentheses to include the original text when translating proper nouns, names, technical terms, or specific words that should not be translated.
+    Use parentheses sparingly and only when absolutely necessary.
+    Preserve any HTML tags such as <span> exactly as they are. Do not alter, add, or remove any characters, words, or line breaks that are not present in the original text.
+
+    Here are examples of correct translations:
+    
+    Example 1:
+    - Original: 네이버 클라우드
+    - Correct translation: Naver Cloud
+    
+    Example 2:
+    - Original: 이전
+    - Correct translation: Previous
+    
+    Example 3:
+    - Original: 다음
+    - Correct translation: Next
+    
+    Example 4:
+    - Original: LIVE
+    - Correct translation: LIVE
+    
+    Example 5:
+    - Original: 연합뉴스
+    - Correct translation: Yonhap News
+    
+    Example 6:
+    - Original: <a>배드민턴협회, 진상조사위 구성…'부상 관리 소홀'엔 적극 반박</a>
+    - Correct translation: <a>Badminton Association forms fact-finding committee... strongly refutes 'negligence in injury management'</a>
+    """
+
+COMPACT_PROMPT = """
+You are a professional translator. Translate each numbered phrase into {target_language}.
+[[format_instructions]]
+Translate literally and treat every phrase as independent. Keep proper nouns, brand names and code as they are.
+Preserve HTML tags exactly. Do not add or remove characters or line breaks that are not in the original.
+Examples: 이전 -> Previous, LIVE -> LIVE, <a>연합뉴스</a> -> <a>Yonhap News</a>
+"""
+
+MINIMAL_PROMPT = """
+Translate each numbered phrase into {target_language}. [[format_instructions]]
+Keep HTML tags, numbers and brand names unchanged.
+"""
+
+# 출력 형식별, 프롬프트 변형별 형식 지시
+FORMAT_INSTRUCTIONS = {
+    "json": {
+        "full": """Only translate the text after the colon (:) in each line. Do not translate or modify the numbers or any JSON syntax.
+    Return your translations in the same numbered format, enclosed in a JSON object like this:
+    {{"0": "translated text 0", "1": "translated text 1", ...}}""",
+        "compact": 'Return only a JSON object mapping each number to its translation, like {{"0": "translated text 0", "1": "translated text 1"}}.',
+        "minimal": 'Reply with only a JSON object like {{"0": "...", "1": "..."}}.',
+    },
+    "lines": {
+        "full": """Only translate the text after the colon (:) in each line. Do not translate or modify the numbers.
+    Return your translations in the same numbered format, one line per phrase, like this:
+    0: translated text 0
+    1: translated text 1
+    Write any line break inside a phrase as \\n and keep \\\\ exactly as written. Do not add any other text before or after the lines.""",
+        "compact": 'Return only one "number: translation" line per phrase, like "0: translated text 0". Write line breaks inside a phrase as \\n.',
+        "minimal": 'Reply with only "number: translation" lines. Write line breaks as \\n.',
+    },
+}
+OUTPUT_FORMATS = tuple(FORMAT_INSTRUCTIONS)
+
+# 이름 -> (버전, 프롬프트 본문). 풍부한 것부터 순서대로
+PROMPTS = {
+    "full": ("v1", FULL_PROMPT),
+    "compact": ("v1", COMPACT_PROMPT),
+    "minimal": ("v1", MINIMAL_PROMPT),
+}
+
+# 배치 크기에 따라 고르는 모드
+AUTO = "auto"
+
+# auto 모드에서 프롬프트 토큰이 배치 본문 토큰의 몇 배까지 허용되는지
+MAX_PROMPT_OVERHEAD_RATIO = 1.0
+
+
+def prompt_id(name):
+    version, _ = PROMPTS[name]
+    return f"{name}-{version}"
+
+
+def get_system_prompt(prompt_version, output_format="json"):
+    # "full-v1" 같은 id와 출력 형식으로 프롬프트 본문을 만든다
+    name, _, version = prompt_version.partition("-")
+    if name not in PROMPTS or PROMPTS[name][0] != version:
+        raise ValueError(f"알 수 없는 프롬프트 버전입니다: {prompt_version}")
+    instructions = FORMAT_INSTRUCTIONS[resolve_output_format(output_format)][name]
+    return PROMPTS[name][1].replace("[[format_instructions]]", instructions)
+
+
+def prompt_overhead_tokens(prompt_version, output_format="json"):
+    # 배치마다 반복해서 보내는 시스템 프롬프트의 추정 토큰 수
+    return estimate_tokens(get_system_prompt(prompt_version, output_format))
+
+
+def cache_prompt_id(mode):
+    # 캐시 키에 넣을 프롬프트 식별자 (auto는 모든 변형의 버전을 합쳐서 쓴다)
+    if mode == AUTO:
+        return AUTO + "-" + ".".join(prompt_id(name) for name in PROMPTS)
+    return prompt_id(resolve_mode(mode))
+
+
+def resolve_mode(mode):
+    if mode != AUTO and mode not in PROMPTS:
+        raise ValueError(f"알 수 없는 프롬프트 모드입니다: {mode}")
+    return mode
+
+
+def resolve_output_format(output_format):
+    if output_format not in FORMAT_INSTRUCTIONS:
+        raise ValueError(f"알 수 없는 출력 형식입니다: {output_format}")
+    return output_format
+
+
+def select_prompt_version(texts, mode, output_format="json"):
+    # 배치에 쓸 프롬프트 id를 고른다.
+    # auto면 프롬프트 비용이 본문 비용의 MAX_PROMPT_OVERHEAD_RATIO배를 넘지 않는 가장 풍부한 변형을 쓰고,
+    # 짧은 UI 문구 몇 개뿐인 배치처럼 어느 것도 맞지 않으면 가장 작은 변형을 쓴다.
+    mode = resolve_mode(mode)
+    if mode != AUTO:
+        return prompt_id(mode)
+
+    batch_tokens = sum(estimate_tokens(text) for text in texts)
+    for name in PROMPTS:
+        if prompt_overhead_tokens(prompt_id(name), output_format) <= batch_tokens * MAX_PROMPT_OVERHEAD_RATIO:
+            return prompt_id(name)
+    return prompt_id(list(PROMPTS)[-1])
@@ -0,0 +1,266 @@
+import asyncio
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# 여러 LLM 공급자(모델)를 풀로 묶어 배치 성격에 맞는 공급자로 보내고,
+# 호출이 그 공급자의 평소 p95 지연을 넘기면 다음 공급자에도 같은 요청을 보내(헤지) 먼저 온 응답을 쓴다.
+
+# 공급자 목록 (JSON). 없으면 Gemini 기본 모델 하나만 쓴다
+#   [{"name": "flash", "kind": "gemini", "model": "gemini-1.5-flash", "profiles": ["short", "long"]},
+#    {"name": "mini", "kind": "openai", "model": "gpt-4o-mini", "profiles": ["short"], "base_url": "http://localhost:8000/v1"}]
+PROVIDERS = os.getenv("TRANSLATE_PROVIDERS", "")
+# 공급자마다 기억하는 최근 호출 수 (지연 분위수와 오류율 계산용)
+PROVIDER_WINDOW = int(os.getenv("TRANSLATE_PROVIDER_WINDOW", "200"))
+# 지연 기록이 이만큼 쌓이기 전의 공급자는 먼저 써 보고, 헤지 기준(p95)도 잡지 않는다
+PROVIDER_MIN_SAMPLES = int(os.getenv("TRANSLATE_PROVIDER_MIN_SAMPLES", "5"))
+# 이 확률로 두 번째 공급자에 보내 통계를 새로 고친다
+PROVIDER_EXPLORE_RATE = float(os.getenv("TRANSLATE_PROVIDER_EXPLORE_RATE", "0.05"))
+# 오류율이 점수에 주는 가중치 (오류율 10%면 지연이 2배인 공급자로 본다)
+PROVIDER_ERROR_PENALTY = float(os.getenv("TRANSLATE_PROVIDER_ERROR_PENALTY", "10"))
+# 전체 호출 중 헤지로 더 보낼 수 있는 비율 (0이면 헤지하지 않는다)
+HEDGE_BUDGET = float(os.getenv("TRANSLATE_HEDGE_BUDGET", "0.2"))
+# 문자열 평균 길이가 이 이하인 배치는 짧은 UI 문구(short), 그보다 길면 long
+SHORT_TEXT_CHARS = int(os.getenv("TRANSLATE_SHORT_TEXT_CHARS", "40"))
+
+PROFILES = ("short", "long")
+
+
+def batch_profile(texts):
+    texts = list(texts)
+    if not texts:
+        return "short"
+    return "short" if sum(len(text) for text in texts) / len(texts) <= SHORT_TEXT_CHARS else "long"
+
+
+def make_client_factory(spec):
+    # 공급자 설정으로 temperature -> LLM 클라이언트 함수를 만든다
+    # 공급자 SDK는 무거우므로 설정된 공급자의 것만 처음 클라이언트를 만들 때 불러온다
+    kind = spec.get("kind", "gemini")
+    if kind == "gemini":
+        def create(temperature):
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            return ChatGoogleGenerativeAI(
+                model=spec["model"], api_key=os.getenv(spec.get("api_key_env", "GEMINI_API")), temperature=temperature
+            )
+
+        return create
+    if kind == "openai":
+        def create(temperature):
+            from langchain_openai import ChatOpenAI
+
+            # OpenAI 호환 서버(로컬 스텁 포함)는 base_url로 지정한다
+            return ChatOpenAI(
+                model=spec["model"], api_key=os.getenv(spec.get("api_key_env", "OPENAI_API_KEY")),
+                base_url=spec.get("base_url"), temperature=temperature,
+            )
+
+        return create
+    raise ValueError(f"알 수 없는 공급자 종류입니다: {kind} (가능한 값: gemini, openai)")
+
+
+def load_providers(default_model):
+    specs = json.loads(PROVIDERS) if PROVIDERS else [{"name": "gemini", "kind": "gemini", "model": default_model}]
+    return [
+        Provider(spec.get("name", spec["model"]), make_client_factory(spec), spec.get("profiles", PROFILES), spec["model"])
+        for spec in specs
+    ]
+
+
+class ProviderStats:
+    # 최근 호출의 지연과 성공/실패를 창 크기만큼 기억한다
+    def __init__(self, window=PROVIDER_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self._failures = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def record(self, seconds, ok):
+        # 실패는 빨리 끝나도 지연 기록에 넣지 않는다 (빠른 공급자로 보이지 않도록)
+        with self._lock:
+            self.calls += 1
+            self._failures.append(0 if ok else 1)
+            if ok:
+                self._latencies.append(seconds)
+            else:
+                self.errors += 1
+
+    def record_cancelled(self):
+        # 헤지에서 진 호출은 지연 기록에 넣지 않는다.
+        # 헤지 기준(p95)보다 긴 값만 쌓여 기준이 점점 꼬리 쪽으로 올라가기 때문이다
+        with self._lock:
+            self.cancelled += 1
+
+    def samples(self):
+        return len(self._latencies)
+
+    def percentile(self, q):
+        with self._lock:
+            values = sorted(self._latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, round(q / 100 * (len(values) - 1)))]
+
+    def error_rate(self):
+        with self._lock:
+            return sum(self._failures) / len(self._failures) if self._failures else 0.0
+
+
+class Provider:
+    def __init__(self, name, client_factory, profiles=PROFILES, model=None):
+        self.name = name
+        self.model = model or name
+        self.profiles = set(profiles)
+        self.stats = ProviderStats()
+        self._client_factory = client_factory
+        self._clients = {}  # temperature -> LLM 클라이언트
+        self._lock = threading.Lock()
+
+    def client(self, temperature):
+        client = self._clients.get(temperature)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(temperature)
+                if client is None:
+                    client = self._clients[temperature] = self._client_factory(temperature)
+        return client
+
+
+class ProviderPool:
+    def __init__(
+        self, providers, min_samples=PROVIDER_MIN_SAMPLES, explore_rate=PROVIDER_EXPLORE_RATE,
+        error_penalty=PROVIDER_ERROR_PENALTY, hedge_budget=HEDGE_BUDGET, seed=None,
+    ):
+        self.providers = list(providers)
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self.error_penalty = error_penalty
+        self.hedge_budget = hedge_budget
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.hedges = 0
+
+    def fingerprint(self):
+        # 캐시와 번역 메모리 키에 들어가는 모델 집합. 풀 안의 공급자끼리는 번역을 서로 바꿔 써도 되는 것으로 보고,
+        # 공급자 구성이 바뀌면 다른 키가 되어 이전 모델의 번역을 쓰지 않는다
+        return "+".join(sorted({p.model for p in self.providers}))
+
+    def _score(self, provider):
+        # 낮을수록 먼저 쓴다. 기록이 적은 공급자는 먼저 써 본다
+        stats = provider.stats
+        if stats.samples() < self.min_samples:
+            return -1.0
+        return stats.percentile(50) * (1 + self.error_penalty * stats.error_rate())
+
+    def route(self, profile):
+        # 이 배치를 보낼 순서대로 공급자를 반환한다. 배치 성격에 맞는 공급자가 먼저이고,
+        # 나머지는 헤지 대상으로만 뒤에 붙는다
+        matching = sorted((p for p in self.providers if profile in p.profiles), key=self._score)
+        others = sorted((p for p in self.providers if profile not in p.profiles), key=self._score)
+        ordered = (matching or others) + (others if matching else [])
+        if len(matching or others) > 1 and self._random.random() < self.explore_rate:
+            ordered[0], ordered[1] = ordered[1], ordered[0]
+        return ordered
+
+    def hedge_delay(self, provider):
+        if self.hedge_budget <= 0 or provider.stats.samples() < self.min_samples:
+            return None
+        return provider.stats.percentile(95)
+
+    def _take_hedge(self):
+        # 헤지 예산이 남아 있으면 하나 쓴다 (기준 시간이 지난 시점에 확인해야 동시에 기다리던 호출이 한꺼번에 헤지하지 않는다)
+        if self.hedges + 1 > self.hedge_budget * self.calls:
+            return False
+        self.hedges += 1
+        return True
+
+    async def _call(self, provider, prompt_value, temperature):
+        started_at = time.perf_counter()
+        try:
+            message = await provider.client(temperature).ainvoke(prompt_value)
+        except asyncio.CancelledError:
+            provider.stats.record_cancelled()
+            metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="cancelled")
+            raise
+        except Exception:
+            provider.stats.record(time.perf_counter() - started_at, ok=False)
+            metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="error")
+            raise
+        seconds = time.perf_counter() - started_at
+        provider.stats.record(seconds, ok=True)
+        metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="ok")
+        metrics.PROVIDER_SECONDS.observe(seconds, provider=provider.name)
+        return message
+
+    async def invoke(self, prompt_value, profile, temperature):
+        # 첫 공급자가 p95 안에 답하지 않으면 다음 공급자에도 보내고, 먼저 성공한 응답을 쓴다. 진 쪽은 취소한다
+        ordered = self.route(profile)
+        self.calls += 1
+        delay = self.hedge_delay(ordered[0]) if len(ordered) > 1 else None
+        if delay is None:
+            return await self._call(ordered[0], prompt_value, temperature)
+
+        tasks = [asyncio.ensure_future(self._call(ordered[0], prompt_value, temperature))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._take_hedge():
+                tasks.append(asyncio.ensure_future(self._call(ordered[1], prompt_value, temperature)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if len(tasks) > 1:
+                            metrics.HEDGES.inc(outcome="won" if task is tasks[1] else "lost")
+                        return task.result()
+                    error = task.exception()
+            if len(tasks) > 1:
+                metrics.HEDGES.inc(outcome="failed")
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @contextlib.asynccontextmanager
+    async def stream(self, prompt_value, profile, temperature):
+        # 스트리밍 호출은 헤지하지 않는다 (받은 줄을 바로 넘기므로 두 응답 중 하나를 고를 수 없다)
+        provider = self.route(profile)[0]
+        self.calls += 1
+        started_at = time.perf_counter()
+        try:
+            async with contextlib.aclosing(provider.client(temperature).astream(prompt_value)) as stream:
+                yield stream
+        except asyncio.CancelledError:
+            provider.stats.record_cancelled()
+            metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="cancelled")
+            raise
+        except Exception:
+            provider.stats.record(time.perf_counter() - started_at, ok=False)
+            metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="error")
+            raise
+        seconds = time.perf_counter() - started_at
+        provider.stats.record(seconds, ok=True)
+        metrics.PROVIDER_CALLS.inc(provider=provider.name, outcome="ok")
+        metrics.PROVIDER_SECONDS.observe(seconds, provider=provider.name)
+
+    def warmup(self, temperature):
+        # 공급자 SDK를 불러오고 LLM 클라이언트를 미리 만든다
+        for provider in self.providers:
+            provider.client(temperature)
+
+    def latency_p95(self):
+        return {p.name: p.stats.percentile(95) or 0.0 for p in self.providers}
+
+    def error_rates(self):
+        return {p.name: p.stats.error_rate() for p in self.providers}
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+# 429/할당량 초과로 판단할 예외 이름과 메시지 조각
+RATE_LIMIT_ERROR_NAMES = {"ResourceExhausted", "RateLimitError", "TooManyRequests"}
+RATE_LIMIT_ERROR_MESSAGES = ("429", "quota", "rate limit", "resource exhausted", "resource has been exhausted")
+
+
+def is_rate_limit_error(error):
+    if type(error).__name__ in RATE_LIMIT_ERROR_NAMES:
+        return True
+    message = str(error).lower()
+    return any(part in message for part in RATE_LIMIT_ERROR_MESSAGES)
+
+
+class RateLimiter:
+    # 분당 요청 수와 분당 토큰 수를 함께 지키는 토큰 버킷.
+    # 프로세스 전체에서 공유하므로 이벤트 루프가 아니라 스레드 락으로 상태를 보호한다.
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def _refill_locked(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    async def acquire(self, tokens):
+        # 버킷 용량보다 큰 요청은 용량만큼만 기다린다 (영원히 대기하지 않도록)
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill_locked(now)
+                if now >= self._blocked_until and self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    self._blocked_until - now,
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                )
+            await asyncio.sleep(max(wait, 0.01))
+
+    def adjust(self, tokens):
+        # 실제 사용량을 알게 되면 추정치와의 차이만큼 버킷을 보정한다 (양수면 더 차감)
+        with self._lock:
+            self._tokens = min(self.tokens_per_minute, self._tokens - tokens)
+
+    def penalize(self, seconds):
+        # 429를 받으면 모든 호출을 잠시 멈춘다
+        with self._lock:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class AIMDController:
+    # ConcurrencyLimiter의 한도를 AIMD 방식으로 조절한다.
+    # 성공이 한도만큼 쌓이면 1씩 늘리고, 429/할당량 오류를 받으면 절반으로 줄인다.
+    def __init__(self, limiter, min_limit, max_limit, increase=1, decrease_factor=0.5, cooldown=5.0):
+        self.limiter = limiter
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            limit = self.limiter.limit
+            if self._successes >= limit and limit < self.max_limit:
+                self._successes = 0
+                self.limiter.set_limit(min(self.max_limit, limit + self.increase))
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            # 동시에 실패한 호출들이 한도를 연달아 깎지 않도록 cooldown 동안은 한 번만 줄인다
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            limit = self.limiter.limit
+            self.limiter.set_limit(max(self.min_limit, int(limit * self.decrease_factor)))
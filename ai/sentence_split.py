@@ -0,0 +1,65 @@
+import re
+
+from validation import TAG_PATTERN
+
+# 긴 문단 하나가 배치 하나를 독차지하지 않도록 문장 경계에서 나눈다.
+# 조각을 이어 붙이면 원문과 똑같아야 하고, 태그 안이나 열린 태그 쌍(<a>...</a>) 안에서는 나누지 않는다.
+
+# 문장 끝: 라틴 문장부호 뒤에는 공백이 있어야 하고(3.8, e.g.의 가운데 점은 제외), CJK 문장부호는 공백이 없어도 된다
+SENTENCE_END = re.compile(r"(?:[.!?…]+[\"'”’)\]]*\s+|[。！？]+[」』”’)]*\s*)")
+# 문장 끝으로 보지 않는 약어 (마침표 바로 앞의 단어)
+ABBREVIATIONS = {"e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "st", "fig", "approx", "inc", "ltd", "co"}
+ABBREVIATION_WORD = re.compile(r"([\w.]+)\.[\"'”’)\]]*\s+$")
+# 닫는 태그가 없는 요소
+VOID_TAGS = {"br", "img", "hr", "input", "wbr", "meta", "link", "source", "area", "col", "embed", "param", "track", "base"}
+
+
+def _is_abbreviation(text, end):
+    match = ABBREVIATION_WORD.search(text[:end])
+    if match is None:
+        return False
+    word = match.group(1).lower()
+    # 점이 들어간 약어(U.S.)와 한 글자 약어(J. Smith)도 문장 끝으로 보지 않는다
+    return word in ABBREVIATIONS or "." in word or len(word) == 1
+
+
+def sentence_boundaries(text):
+    # 나눌 수 있는 위치(조각이 끝나는 인덱스) 목록
+    tags = list(TAG_PATTERN.finditer(text))
+    candidates = [match.end() for match in SENTENCE_END.finditer(text) if match.end() < len(text)]
+    boundaries = []
+    open_tags = []
+    tag_index = 0
+    for position in candidates:
+        # position 앞에서 끝나는 태그까지 열린 태그 목록에 반영한다
+        while tag_index < len(tags) and tags[tag_index].start() < position:
+            tag = tags[tag_index]
+            if tag.end() > position:
+                break
+            closing, name, self_closing = tag.group(1), tag.group(2).lower(), tag.group(3)
+            if closing:
+                if name in open_tags:
+                    del open_tags[len(open_tags) - 1 - open_tags[::-1].index(name)]
+            elif not self_closing and name not in VOID_TAGS:
+                open_tags.append(name)
+            tag_index += 1
+        inside_tag = tag_index < len(tags) and tags[tag_index].start() < position
+        if not inside_tag and not open_tags and not _is_abbreviation(text, position):
+            boundaries.append(position)
+    return boundaries
+
+
+def split_long_text(text, max_chars):
+    # max_chars보다 긴 문자열을 문장 경계에서 max_chars 이하의 조각들로 나눈다 (한 문장이 더 길면 그 문장은 그대로).
+    # 나눌 필요가 없거나 나눌 곳이 없으면 [text]
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    start = previous = 0
+    for boundary in sentence_boundaries(text) + [len(text)]:
+        if boundary - start > max_chars and previous > start:
+            pieces.append(text[start:previous])
+            start = previous
+        previous = boundary
+    pieces.append(text[start:])
+    return pieces
@@ -1,19 +1,274 @@
-from flask import Flask, request, jsonify
+from quart import Quart, request, jsonify, Response
 import asyncio
-import hypercorn.asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from multiprocessing.connection import wait
+from hypercorn.asyncio.run import asyncio_worker
 from hypercorn.config import Config
-from async_call_LLM import translate_text
+from translation_store import text_hash
+import metrics
 
-app = Flask(__name__)
+# 워커(프로세스) 수. 워커마다 이벤트 루프 하나를 계속 쓰므로 캐시, 세마포어, LLM 클라이언트를 요청끼리 공유한다
+WORKERS = int(os.getenv("TRANSLATE_WORKERS", "1"))
+BIND = os.getenv("TRANSLATE_BIND", "0.0.0.0:3001")
+# 유휴 keep-alive 연결을 닫기까지의 시간(초)과 요청 본문 최대 크기(바이트)
+KEEP_ALIVE_SECONDS = float(os.getenv("TRANSLATE_KEEP_ALIVE_SECONDS", "75"))
+MAX_REQUEST_BYTES = int(os.getenv("TRANSLATE_MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
+# 큰 페이지 번역은 오래 걸리므로 응답 제한 시간을 넉넉히 둔다
+RESPONSE_TIMEOUT_SECONDS = float(os.getenv("TRANSLATE_RESPONSE_TIMEOUT_SECONDS", "300"))
+# 종료 시 진행 중인 요청과 LLM 호출이 끝나기를 기다리는 최대 시간(초)
+GRACEFUL_TIMEOUT_SECONDS = float(os.getenv("TRANSLATE_GRACEFUL_TIMEOUT_SECONDS", "30"))
+# 워밍업 때 문장 하나를 실제로 번역해 LLM 연결까지 열어 둘지 여부 (실패해도 준비 상태가 된다)
+WARMUP_CALL = os.getenv("TRANSLATE_WARMUP_CALL", "true").lower() in ("1", "true", "yes")
+WARMUP_LANGUAGE = os.getenv("TRANSLATE_WARMUP_LANGUAGE", "ko")
+WARMUP_TEXT = "Hello"
+# 임포트나 번역기 준비가 실패하면 이 간격(초)부터 두 배씩 늘려 가며(최대 WARMUP_MAX_BACKOFF_SECONDS) 다시 시도한다
+WARMUP_BACKOFF_SECONDS = float(os.getenv("TRANSLATE_WARMUP_BACKOFF_SECONDS", "1"))
+WARMUP_MAX_BACKOFF_SECONDS = float(os.getenv("TRANSLATE_WARMUP_MAX_BACKOFF_SECONDS", "30"))
+
+app = Quart(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+app.config["RESPONSE_TIMEOUT"] = RESPONSE_TIMEOUT_SECONDS
+
+# 워커 상태 (starting -> ready -> draining, 워밍업이 실패해 다시 시도하는 동안은 failed)
+state = {"status": "starting"}
+
+
+def pipeline():
+    # 번역 파이프라인(LangChain, 공급자 SDK)은 불러오는 데 오래 걸린다.
+    # 감독 프로세스는 쓰지 않으므로 불러오지 않고, 워커는 워밍업에서 처음 불러온다
+    import async_call_LLM
+
+    return async_call_LLM
+
+
+async def warmup():
+    # 모듈 임포트 -> 번역기와 LLM 클라이언트, 저장소 연결 -> 번역 한 번 순서로 준비하고 단계별 시간을 남긴다.
+    # 그동안 /healthz는 응답하고 /readyz는 503을 준다
+    started_at = time.perf_counter()
+
+    def phase(name):
+        nonlocal started_at
+        now = time.perf_counter()
+        metrics.STARTUP_SECONDS.set(now - started_at, phase=name)
+        started_at = now
+
+    # 임포트와 번역기 준비가 없으면 요청을 받을 수 없으므로 성공할 때까지 다시 시도한다
+    backoff = WARMUP_BACKOFF_SECONDS
+    while True:
+        try:
+            # 임포트는 스레드에서 해서 그동안에도 이벤트 루프가 요청을 받는다
+            module = await asyncio.to_thread(pipeline)
+            phase("import")
+            # LLM 클라이언트가 이 이벤트 루프에서 만들어지도록 여기서 직접 부른다
+            module.warmup_translators()
+            phase("translators")
+            break
+        except Exception as e:
+            print(f"워밍업 실패, {backoff:g}초 뒤 다시 시도합니다: {e}")
+            state["status"] = "failed"
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WARMUP_MAX_BACKOFF_SECONDS)
+            started_at = time.perf_counter()
+
+    if WARMUP_CALL:
+        # 번역 한 번은 연결을 미리 여는 용도라 실패해도 준비 상태가 된다 (첫 요청이 다시 연결한다)
+        try:
+            fallback = 0
+            async for record in module.translate_text_stream(
+                {"strs": [WARMUP_TEXT], "language": WARMUP_LANGUAGE, "priority": "interactive"}
+            ):
+                if record.get("done"):
+                    fallback = record["fallback"]
+            if fallback:
+                print("워밍업 번역 실패: 첫 요청에서 LLM 연결을 다시 시도합니다.")
+        except Exception as e:
+            print(f"워밍업 번역 실패: {e}")
+        phase("first_call")
+    state["status"] = "ready"
+
+
+@app.before_serving
+async def startup():
+    # 워밍업은 백그라운드에서 한다 (준비 상태는 /readyz로 알린다)
+    app.add_background_task(warmup)
+
+
+@app.after_serving
+async def shutdown():
+    # hypercorn이 새 연결을 닫고 진행 중인 요청을 기다린 뒤 불린다.
+    # 그 사이 취소되지 않고 남은 LLM 호출이 있으면 끝날 때까지 조금 더 기다린다
+    state["status"] = "draining"
+    if "async_call_LLM" not in sys.modules:
+        return
+    module = pipeline()
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT_SECONDS
+    while (module.llm_limiter.active or module.llm_limiter.waiting) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    # 저장소에 모아 둔 번역을 디스크에 쓰고 닫는다
+    if module.translation_store is not None:
+        await asyncio.to_thread(module.translation_store.close, GRACEFUL_TIMEOUT_SECONDS)
+
+
+async def read_request():
+    # 우선순위는 본문의 "priority" 필드나 X-Translate-Priority 헤더로 정한다 (interactive, bulk, auto)
+    data = await request.get_json()
+    priority = request.headers.get("X-Translate-Priority")
+    if priority and "priority" not in data:
+        data["priority"] = priority
+    return data
+
+
+def invalid_options(data):
+    # 알 수 없는 prompt, output_format, priority는 클라이언트 오류이므로 JSON 400을 돌려준다. 문제가 없으면 None
+    try:
+        pipeline().validate_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return None
 
 
 @app.route("/translate", methods=["POST"])
 async def translate():
-    data = request.get_json()
-    translation = await translate_text(data)
+    data = await read_request()
+    error = invalid_options(data)
+    if error is not None:
+        return error
+    translation = await pipeline().translate_text(data)
     return jsonify(translation)
 
+
+@app.route("/translate/stream", methods=["POST"])
+async def translate_stream():
+    # 배치가 끝나는 대로 {"index", "translation"} 레코드를 NDJSON으로 내보낸다
+    data = await read_request()
+    # 스트림은 응답을 시작한 뒤에는 상태 코드를 바꿀 수 없으므로 먼저 확인한다
+    error = invalid_options(data)
+    if error is not None:
+        return error
+
+    async def generate():
+        stream = pipeline().translate_text_stream(data)
+        try:
+            async for record in stream:
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 배치도 취소된다
+            await stream.aclose()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/translate/bulk", methods=["POST"])
+async def translate_bulk_documents():
+    # 여러 문서 x 여러 언어를 한 번에 번역한다 (크롤러 작업용)
+    data = await read_request()
+    error = invalid_options(data)
+    if error is not None:
+        return error
+    translation = await pipeline().translate_bulk(data)
+    return jsonify(translation)
+
+
+def store_hashes(data):
+    # 해시("hashes")를 주거나 원문("strs")을 주면 여기서 해시를 만든다
+    if "hashes" in data:
+        return data["hashes"]
+    return [text_hash(text) for text in data.get("strs", [])]
+
+
+@app.route("/store/get", methods=["POST"])
+async def store_get():
+    # 번역 저장소 묶음 조회. 입력: {"language", "hashes" 또는 "strs"}, 출력: {"translations": {hash: 번역}} (찾은 것만)
+    store = pipeline().translation_store
+    if store is None:
+        return jsonify({"error": "번역 저장소가 꺼져 있습니다."}), 503
+    data = await request.get_json()
+    translations = await asyncio.to_thread(store.get_many, store_hashes(data), data["language"])
+    return jsonify({"translations": translations})
+
+
+@app.route("/store/put", methods=["POST"])
+async def store_put():
+    # 번역 저장소 묶음 저장. 입력: {"language", "items": [{"hash" 또는 "str", "content"}]}.
+    # 쓰기 대기열에 넣고 바로 응답한다 (디스크에는 모아서 쓴다)
+    store = pipeline().translation_store
+    if store is None:
+        return jsonify({"error": "번역 저장소가 꺼져 있습니다."}), 503
+    data = await request.get_json()
+    translations = {
+        item["hash"] if "hash" in item else text_hash(item["str"]): item["content"] for item in data["items"]
+    }
+    store.put_many(translations, data["language"])
+    return jsonify({"stored": len(translations)})
+
+
+@app.route("/healthz", methods=["GET"])
+async def health():
+    # 프로세스가 살아서 요청을 처리할 수 있는지 (liveness)
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+async def readiness():
+    # 워밍업이 끝났고 종료 중이 아닐 때만 200 (readiness)
+    return jsonify({"status": state["status"]}), 200 if state["status"] == "ready" else 503
+
+
+@app.route("/metrics", methods=["GET"])
+async def prometheus_metrics():
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def serve(config, workers):
+    # hypercorn.run.run은 워커 하나가 먼저 끝나면 나머지 워커를 바로 종료시켜서 드레인 중인 요청이 끊긴다.
+    # 여기서는 종료 신호를 모든 워커에 알리고 전부 정리를 마칠 때까지 기다린다.
+    sockets = config.create_sockets()
+    context = multiprocessing.get_context("spawn")
+    shutdown_event = context.Event()
+
+    def start_worker():
+        process = context.Process(
+            target=asyncio_worker,
+            kwargs={"config": config, "sockets": sockets, "shutdown_event": shutdown_event},
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    # 터미널의 Ctrl+C가 워커에 직접 가지 않도록 무시한 상태로 워커를 만든다
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    processes = [start_worker() for _ in range(workers)]
+    for signal_name in ("SIGINT", "SIGTERM"):
+        signal.signal(getattr(signal, signal_name), lambda *_: shutdown_event.set())
+
+    while not shutdown_event.is_set():
+        wait([process.sentinel for process in processes], timeout=1)
+        # 서비스 중에 죽은 워커는 새로 띄운다
+        if not shutdown_event.is_set():
+            processes = [process if process.is_alive() else start_worker() for process in processes]
+
+    # 워커마다 hypercorn의 graceful_timeout과 after_serving 드레인을 차례로 거친다
+    for process in processes:
+        process.join(GRACEFUL_TIMEOUT_SECONDS * 2 + 5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    for sock in sockets.insecure_sockets + sockets.secure_sockets:
+        sock.close()
+    return max((process.exitcode or 0 for process in processes), default=0)
+
+
 if __name__ == "__main__":
     config = Config()
-    config.bind = ["0.0.0.0:3001"]
-    asyncio.run(hypercorn.asyncio.serve(app, config))
+    config.bind = [BIND]
+    config.application_path = "server:app"
+    config.workers = WORKERS
+    config.keep_alive_timeout = KEEP_ALIVE_SECONDS
+    config.graceful_timeout = GRACEFUL_TIMEOUT_SECONDS
+    sys.exit(serve(config, WORKERS))
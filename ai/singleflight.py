@@ -0,0 +1,51 @@
+import asyncio
+import concurrent.futures
+import threading
+
+
+class Abandoned(Exception):
+    # 번역하던 요청이 취소되어 결과가 오지 않는다. 기다리던 요청이 다시 맡아 번역해야 한다
+    pass
+
+
+class SingleFlight:
+    # 같은 키를 이미 다른 요청이 번역하고 있으면 새 LLM 호출을 만들지 않고 그 결과를 기다린다.
+    # 모듈 전역 객체라 asyncio.run을 여러 번 부르는 벤치마크와 명령행 도구에서는 여러 이벤트 루프에서 쓰이므로
+    # 루프에 묶이지 않는 concurrent.futures.Future를 쓴다 (서버 워커에서는 루프가 하나뿐이다).
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    def claim(self, key):
+        # (future, owner)를 반환한다. owner가 True이면 호출한 쪽이 번역하고 resolve 해야 한다.
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            return future, True
+
+    def resolve(self, key, value):
+        # 번역 실패 시에는 value에 None을 넘긴다 (기다리던 쪽은 원문을 사용)
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(value)
+
+    def abandon(self, key):
+        # 번역하던 요청이 취소되었을 때 부른다. 기다리던 쪽은 wait에서 Abandoned를 받는다
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is not None and not future.done():
+            future.set_exception(Abandoned(key))
+
+    @staticmethod
+    async def wait(future):
+        # 기다리던 요청이 취소되어도 공유 Future는 취소되지 않도록 shield로 감싼다
+        return await asyncio.shield(asyncio.wrap_future(future))
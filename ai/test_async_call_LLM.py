@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+import async_call_LLM
+import benchmark
+
+MARKUP = [
+    "Learn <a href='q'>more</a> now",
+    'See the <code class="language-python">torch.tensor</code> docs and <b>read <i>this</i></b>',
+]
+
+
+@pytest.mark.parametrize("output_format", ["json", "lines"])
+def test_translate_keeps_original_tags(output_format):
+    # 태그는 자리표시자로 바꿔 보내지만 응답에는 원래 태그와 속성이 돌아와야 한다
+    benchmark.install_fake_llm()
+    result = asyncio.run(
+        async_call_LLM.translate_text({"strs": MARKUP, "language": "ko", "output_format": output_format})
+    )
+    assert result["strs"] == [f"[번역] {text}" for text in MARKUP]
+
+
+def test_waiter_translates_when_owner_is_cancelled():
+    # 같은 문자열을 번역하던 요청이 취소되어도 기다리던 요청은 원문이 아니라 번역을 받아야 한다
+    benchmark.install_fake_llm(latency=0.2, jitter=0.0)
+    text = "Learn the basics of tensors"
+
+    async def main():
+        owner = asyncio.ensure_future(async_call_LLM.translate_text({"strs": [text], "language": "ko"}))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(async_call_LLM.translate_text({"strs": [text], "language": "ko"}))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(main())["strs"] == [f"[번역] {text}"]
+
+
+def test_lines_format_keeps_literal_backslash_n():
+    # 코드 조각 속 "\n" 두 글자가 줄바꿈으로 바뀌면 안 된다
+    benchmark.install_fake_llm()
+    texts = ["Call print('x\\ny') first", "Two\nlines"]
+    result = asyncio.run(async_call_LLM.translate_text({"strs": texts, "language": "ko", "output_format": "lines"}))
+    assert result["strs"] == [f"[번역] {text}" for text in texts]
@@ -0,0 +1,15 @@
+import pytest
+
+from line_protocol import escape_text, format_lines, parse_line, unescape_text
+
+
+@pytest.mark.parametrize("text", ["x\\ny", "a\nb", "C:\\new\\table", "end\\", "\\\\n", "line\\\nbreak", ""])
+def test_escape_round_trip(text):
+    escaped = escape_text(text)
+    assert "\n" not in escaped
+    assert unescape_text(escaped) == text
+
+
+def test_parse_formatted_line_keeps_backslashes():
+    line = format_lines(["print('a\\nb')\nnext"])
+    assert parse_line(line) == ("0", "print('a\\nb')\nnext")
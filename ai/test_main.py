@@ -0,0 +1,14 @@
+import os
+
+import main
+
+
+def test_translate_empty_file(tmp_path):
+    # 빈 입력은 번역할 것이 없으므로 빈 출력만 남기고 끝난다 (체크포인트도 남지 않는다)
+    input_path = tmp_path / "empty.txt"
+    input_path.write_text("", encoding="utf-8")
+    output_path = tmp_path / "empty.ko.txt"
+
+    assert main.main([str(input_path), "-o", str(output_path), "-l", "Korean"]) == 0
+    assert output_path.read_text(encoding="utf-8") == ""
+    assert not os.path.exists(str(output_path) + ".checkpoint")
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+import benchmark
+import server
+
+ROUTES = {
+    "/translate": {"strs": ["Get Started"], "language": "ko"},
+    "/translate/stream": {"strs": ["Get Started"], "language": "ko"},
+    "/translate/bulk": {"documents": [{"id": "a", "strs": ["Get Started"]}], "languages": ["ko"]},
+}
+
+
+@pytest.mark.parametrize("route", list(ROUTES))
+@pytest.mark.parametrize(
+    "options, headers",
+    [({"priority": "urgent"}, {}), ({}, {"X-Translate-Priority": "urgent"}), ({"prompt": "huge"}, {}), ({"output_format": "xml"}, {})],
+)
+def test_invalid_options_are_client_errors(route, options, headers):
+    # 잘못된 옵션은 HTML 500이 아니라 JSON 400이어야 한다
+    benchmark.install_fake_llm()
+
+    async def main():
+        response = await server.app.test_client().post(route, json={**ROUTES[route], **options}, headers=headers)
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(main())
+    assert status == 400
+    assert "error" in body
+
+
+@pytest.mark.parametrize("route", list(ROUTES))
+def test_valid_request_is_translated(route):
+    benchmark.install_fake_llm()
+
+    async def main():
+        response = await server.app.test_client().post(route, json={**ROUTES[route], "priority": "interactive"})
+        return response.status_code
+
+    assert asyncio.run(main()) == 200
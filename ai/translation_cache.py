@@ -0,0 +1,107 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 캐시 크기 제한 (항목 수 / 대략적인 바이트 수)과 항목 유효 시간(초)
+CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATE_CACHE_MAX_ENTRIES", "50000"))
+CACHE_MAX_BYTES = int(os.getenv("TRANSLATE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("TRANSLATE_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+# 항목 하나당 키 튜플, 타임스탬프 등에 드는 고정 비용 추정치
+ENTRY_OVERHEAD_BYTES = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    # 유니코드 정규화 + 앞뒤 공백 제거 + 연속 공백을 하나로
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_cache_key(text, language, model, prompt_version):
+    return (normalize_text(text), language.strip().lower(), model, prompt_version)
+
+
+class TranslationCache:
+    # 프로세스 안에서 공유하는 번역 캐시 (LRU + TTL)
+    # 항목 수나 바이트 한도를 넘으면 가장 오래 쓰이지 않은 항목부터 지운다.
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                self._remove_locked(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_many(self, keys):
+        # 찾은 항목만 {key: value}로 돌려준다
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def put(self, key, value):
+        size = ENTRY_OVERHEAD_BYTES + len(key[0].encode("utf-8")) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def put_many(self, items):
+        for key, value in items.items():
+            self.put(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove_locked(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
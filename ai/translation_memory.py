@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from translation_cache import make_cache_key
+
+# 숫자, 날짜, 시간, 개수만 다른 문자열("댓글 12개" / "댓글 13개")을 같은 템플릿("댓글 {0}개")으로 보고,
+# 전에 번역한 템플릿("{0} comments")에 지금 값을 다시 넣어 LLM 없이 번역한다.
+
+# 기억할 템플릿 수
+MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATE_MEMORY_MAX_ENTRIES", "20000"))
+# 템플릿을 다시 쓰려면 같은 번역 템플릿이 이 횟수 이상 나왔고, 그 템플릿의 전체 관측 중 이 비율 이상이어야 한다
+# (관측이 하나면 비율은 항상 100%이므로 최소 두 번은 본 템플릿만 쓴다)
+MEMORY_MIN_OBSERVATIONS = int(os.getenv("TRANSLATE_MEMORY_MIN_OBSERVATIONS", "2"))
+MEMORY_MIN_CONFIDENCE = float(os.getenv("TRANSLATE_MEMORY_MIN_CONFIDENCE", "0.75"))
+
+# 값으로 바꿀 토큰: 숫자와 3.8, 12:30, 1,234, 2024/08/01 같은 숫자 묶음 ("12개"처럼 글자가 바로 붙어도 된다)
+VALUE_PATTERN = re.compile(r"(?<![\d.,:/])\d+(?:[.,:/]\d+)*(?!\d)")
+SLOT = "\ue000"  # 템플릿에서 값 자리를 나타내는 문자 (사용자 영역 문자라 원문에 나오지 않는다)
+
+
+def make_template(text):
+    # (템플릿, 값 목록)을 반환한다. 바꿀 값이 없으면 값 목록이 비어 있다.
+    # 1은 단수/복수 표현이 달라질 수 있으므로("1 comment" / "2 comments") 값으로 보지 않는다
+    values = []
+
+    def replace(match):
+        if match.group(0) == "1":
+            return match.group(0)
+        values.append(match.group(0))
+        return SLOT
+
+    return VALUE_PATTERN.sub(replace, text), values
+
+
+def extract_parts(translation, values):
+    # 번역에서 원문 값이 있던 자리를 찾아 (문자열, 값 번호, 문자열, ...) 형태의 번역 템플릿으로 만든다.
+    # 값마다 번역에 정확히 한 번씩 나와야 하고, 그렇지 않으면 None
+    if len(set(values)) != len(values) or SLOT in translation:
+        return None
+    positions = []
+    for index, value in enumerate(values):
+        matches = list(re.finditer(r"(?<![\d.,:/])" + re.escape(value) + r"(?![\d])", translation))
+        if len(matches) != 1:
+            return None
+        positions.append((matches[0].start(), matches[0].end(), index))
+    positions.sort()
+    parts = []
+    position = 0
+    for start, end, index in positions:
+        if start < position:
+            return None
+        parts.extend((translation[position:start], index))
+        position = end
+    parts.append(translation[position:])
+    return tuple(parts)
+
+
+def fill_parts(parts, values):
+    return "".join(values[part] if isinstance(part, int) else part for part in parts)
+
+
+class TranslationMemory:
+    # 템플릿 -> 번역 템플릿 후보별 관측 횟수를 LRU로 보관한다.
+    # 같은 템플릿이 다르게 번역되거나(값 위치를 찾지 못한 경우 포함) 하면 신뢰도가 내려가 다시 쓰지 않는다.
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, min_observations=MEMORY_MIN_OBSERVATIONS, min_confidence=MEMORY_MIN_CONFIDENCE):
+        self.max_entries = max_entries
+        self.min_observations = min_observations
+        self.min_confidence = min_confidence
+        self._entries = OrderedDict()  # key -> [Counter(번역 템플릿), 전체 관측 수]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # 템플릿은 있지만 신뢰도가 낮아 쓰지 않은 경우
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, text, language, model, prompt_version):
+        # 다시 쓸 수 있는 번역이 있으면 지금 값을 넣어 반환하고, 없으면 None
+        template, values = make_template(text)
+        if not values:
+            return None
+        key = make_cache_key(template, language, model, prompt_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            candidates, total = entry
+            parts, count = candidates.most_common(1)[0] if candidates else (None, 0)
+            if count < self.min_observations or count / total < self.min_confidence:
+                self.rejected += 1
+                return None
+            self.hits += 1
+        return fill_parts(parts, values)
+
+    def learn(self, text, translation, language, model, prompt_version):
+        # LLM이 번역한 결과를 템플릿으로 기억한다
+        template, values = make_template(text)
+        if not values:
+            return
+        key = make_cache_key(template, language, model, prompt_version)
+        parts = extract_parts(translation, values)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [Counter(), 0]
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            if parts is not None:
+                entry[0][parts] += 1
+            entry[1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.rejected
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# 재시작해도 남는 번역 저장소 (SQLite, WAL 모드). 백엔드와 같은 키(원문 sha256 해시, 언어)를 쓴다.
+# 읽기는 요청마다 한 번의 묶음 조회로, 쓰기는 모아 두었다가 백그라운드 스레드가 트랜잭션 하나로 쓴다.
+
+# 저장소 파일의 절대 경로. 기본값은 비어 있고, 그러면 저장소를 쓰지 않는다.
+# 워커마다 같은 파일을 열므로 실행 위치에 따라 바뀌지 않는 절대 경로만 받는다
+STORE_PATH = os.getenv("TRANSLATE_STORE_PATH", "")
+if STORE_PATH and not os.path.isabs(STORE_PATH):
+    raise ValueError(f"TRANSLATE_STORE_PATH는 절대 경로여야 합니다: {STORE_PATH}")
+# 모아 둔 쓰기가 이 개수에 닿거나, 첫 항목이 들어온 뒤 이 시간(초)이 지나면 디스크에 쓴다
+STORE_FLUSH_ROWS = int(os.getenv("TRANSLATE_STORE_FLUSH_ROWS", "500"))
+STORE_FLUSH_SECONDS = float(os.getenv("TRANSLATE_STORE_FLUSH_SECONDS", "1"))
+# SELECT 한 번에 넣는 해시 수 (SQLite 변수 개수 제한보다 작게)
+LOOKUP_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    hash TEXT NOT NULL,
+    language TEXT NOT NULL,
+    content TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (hash, language)
+) WITHOUT ROWID
+"""
+UPSERT = (
+    "INSERT INTO translations (hash, language, content, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (hash, language) DO UPDATE SET content = excluded.content, updated_at = excluded.updated_at"
+)
+
+
+def text_hash(text):
+    # 백엔드(TranslateService.getHash)와 같은 해시
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_language(language):
+    return language.strip().lower()
+
+
+class TranslationStore:
+    # 읽기 연결 하나(잠금으로 보호)와 쓰기 스레드 전용 연결 하나를 쓴다. WAL이라 쓰는 중에도 읽을 수 있다.
+    # 아직 디스크에 쓰지 않은 항목도 조회에서 보인다.
+    def __init__(self, path, flush_rows=STORE_FLUSH_ROWS, flush_seconds=STORE_FLUSH_SECONDS):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._pending = {}  # (hash, language) -> 번역, 쓰기 대기 중
+        self._writing = {}  # 쓰기 스레드가 지금 쓰고 있는 항목
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._read_lock = threading.Lock()
+        self._reader = None
+        self._writer = None
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.flushes = 0
+        self.write_errors = 0
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL에서는 NORMAL이어도 손상되지 않는다 (전원이 나가면 마지막 트랜잭션만 잃을 수 있다)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(SCHEMA)
+        return connection
+
+    def open(self):
+        # 읽기 연결을 미리 연다 (파일 생성, WAL 전환, 테이블 생성)
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+
+    def get_many(self, hashes, language):
+        # 찾은 항목만 {hash: 번역}으로 돌려준다 (블로킹 호출이므로 이벤트 루프에서는 스레드로 부른다)
+        language = normalize_language(language)
+        unique = list(dict.fromkeys(hashes))
+        found = {}
+        missing = []
+        with self._lock:
+            for digest in unique:
+                key = (digest, language)
+                value = self._pending.get(key)
+                if value is None:
+                    value = self._writing.get(key)
+                if value is not None:
+                    found[digest] = value
+                else:
+                    missing.append(digest)
+        if missing:
+            self.open()
+            with self._read_lock:
+                for start in range(0, len(missing), LOOKUP_CHUNK_SIZE):
+                    chunk = missing[start:start + LOOKUP_CHUNK_SIZE]
+                    rows = self._reader.execute(
+                        f"SELECT hash, content FROM translations WHERE language = ? AND hash IN ({', '.join('?' * len(chunk))})",
+                        [language, *chunk],
+                    )
+                    found.update(rows)
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, translations, language):
+        # {hash: 번역}을 쓰기 대기열에 넣고 바로 반환한다
+        if not translations:
+            return
+        language = normalize_language(language)
+        with self._wake:
+            if self._closed:
+                return
+            was_empty = not self._pending
+            for digest, content in translations.items():
+                self._pending[(digest, language)] = content
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="translation-store-writer", daemon=True)
+                self._writer.start()
+            if was_empty or len(self._pending) >= self.flush_rows:
+                self._wake.notify_all()
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            with self._wake:
+                while not self._pending and not self._closed:
+                    self._wake.wait()
+                # 첫 항목이 들어오면 조금 더 모은다
+                if not self._closed and len(self._pending) < self.flush_rows:
+                    self._wake.wait(self.flush_seconds)
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+                closing = self._closed
+            if batch:
+                now = time.time()
+                try:
+                    with connection:
+                        connection.execute("BEGIN")
+                        connection.executemany(
+                            UPSERT, [(digest, language, content, now) for (digest, language), content in batch.items()]
+                        )
+                except sqlite3.Error as e:
+                    self.write_errors += 1
+                    print(f"번역 저장소 쓰기 실패 ({len(batch)}건): {e}")
+            with self._wake:
+                self._writing = {}
+                self.writes += len(batch)
+                self.flushes += 1 if batch else 0
+                self._wake.notify_all()
+                if closing and not self._pending:
+                    connection.close()
+                    return
+
+    def flush(self, timeout=None):
+        # 지금까지 넣은 항목이 모두 디스크에 쓰일 때까지 기다린다
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._wake:
+            self._wake.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wake.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        # 남은 쓰기를 마치고 연결을 닫는다
+        with self._wake:
+            self._closed = True
+            self._wake.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+        }
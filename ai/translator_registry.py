@@ -0,0 +1,44 @@
+import threading
+
+
+class TranslatorRegistry:
+    # (temperature, prompt_version, output_format) 별로 만들어 둔 번역기를 프로세스 전체에서 공유한다.
+    # 번역기 안의 LLM 클라이언트, 프롬프트, 파서, 체인은 한 번만 만들어지고
+    # 이후 요청들은 같은 객체(와 그 안의 커넥션)를 재사용한다.
+    def __init__(self, factory):
+        self._factory = factory
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def get(self, temperature, prompt_version, output_format="json"):
+        key = (temperature, prompt_version, output_format)
+        translator = self._translators.get(key)
+        if translator is None:
+            with self._lock:
+                translator = self._translators.get(key)
+                if translator is None:
+                    translator = self._factory(
+                        temperature=temperature,
+                        prompt_version=prompt_version,
+                        output_format=output_format,
+                    )
+                    self._translators[key] = translator
+        return translator
+
+    def warmup(self, keys):
+        # 서버 시작 시 미리 번역기를 만들어 첫 요청이 생성 비용을 내지 않도록 한다
+        for key in keys:
+            self.get(*key)
+
+    def replace_factory(self, factory):
+        # 번역기 생성 함수를 바꾸고 이미 만든 번역기는 버린다 (벤치마크에서 가짜 LLM을 끼울 때)
+        with self._lock:
+            self._factory = factory
+            self._translators.clear()
+
+    def keys(self):
+        return list(self._translators.keys())
+
+    def clear(self):
+        with self._lock:
+            self._translators.clear()
@@ -0,0 +1,37 @@
+import re
+
+# 여는 태그, 닫는 태그, 스스로 닫는 태그를 모두 잡는다 (&lt;span&gt; 같은 엔티티는 태그가 아님)
+TAG_PATTERN = re.compile(r"<\s*(/?)\s*([a-zA-Z][\w:-]*)[^<>]*?(/?)\s*>")
+
+
+def tag_signature(text):
+    # 속성은 무시하고 태그 이름과 종류의 순서만 비교한다
+    return [
+        (closing + self_closing, name.lower())
+        for closing, name, self_closing in TAG_PATTERN.findall(text)
+    ]
+
+
+def check_translation(source, translation):
+    # 문제가 없으면 None, 있으면 실패 사유를 반환한다
+    if translation is None:
+        return "missing"
+    if not isinstance(translation, str) or not translation.strip():
+        return "empty"
+    if tag_signature(source) != tag_signature(translation):
+        return "tags"
+    return None
+
+
+def validate_translations(input_dict, translated_dict):
+    # input_dict의 키마다 결과를 확인해 (통과한 번역, 실패한 키 -> 사유)로 나눈다
+    valid = {}
+    failed = {}
+    for key, source in input_dict.items():
+        translation = translated_dict.get(key)
+        reason = check_translation(source, translation)
+        if reason is None:
+            valid[key] = translation.strip()
+        else:
+            failed[key] = reason
+    return valid, failed
@@ -1,6 +1,7 @@
-import { BaseEntity, Column, Entity, PrimaryGeneratedColumn } from 'typeorm';
+import { BaseEntity, Column, Entity, Index, PrimaryGeneratedColumn } from 'typeorm';
 
 @Entity({ name: 'translate' })
+@Index(['hash', 'language'])
 export class Translate extends BaseEntity {
   @PrimaryGeneratedColumn()
   id: number;
@@ -1,7 +1,7 @@
 import { Injectable } from '@nestjs/common';
 import { TranslateDto } from './translate.dto';
 import { InjectRepository } from '@nestjs/typeorm';
-import { Repository } from 'typeorm';
+import { In, Repository } from 'typeorm';
 import { Translate } from 'src/entities/translate.entity';
 import * as crypto from 'crypto';
 import axios from 'axios';
@@ -19,35 +19,33 @@ export class TranslateService {
 
   async getResult(translateDto: TranslateDto): Promise<TranslateDto> {
     let { strs, language } = translateDto;
+    let hashes = strs.map((str) => this.getHash(str));
 
-    let cache: {
-      index: number;
-      content: string;
-    }[] = [];
-    for (let i = 0; i < strs.length; i++) {
-      let result = await this.translateRepository.findOneBy({
-        hash: this.getHash(strs[i]),
-        language,
-      });
-      if (result) {
-        cache.push({
-          index: i,
-          content: result.content,
-        });
-      }
+    // 저장된 번역을 쿼리 한 번으로 조회한다
+    let rows = await this.translateRepository.findBy({
+      hash: In([...new Set(hashes)]),
+      language,
+    });
+    let translations = new Map<string, string>();
+    for (let row of rows) {
+      translations.set(row.hash, row.content);
     }
 
-    for (let i of cache.reverse()) {
-      strs.splice(i.index, 1);
+    let missing: number[] = [];
+    for (let i = 0; i < strs.length; i++) {
+      if (!translations.has(hashes[i])) {
+        missing.push(i);
+      }
     }
 
-    let body = translateDto;
+    let result = strs.map((str, i) => translations.get(hashes[i]) ?? str);
 
-    if (strs.length > 0) {
+    // 저장되지 않은 문자열만 번역한다
+    if (missing.length > 0) {
       let resp = await axios.post(
         process.env.AI_API,
         {
-          strs,
+          strs: missing.map((i) => strs[i]),
           language,
         },
         {
@@ -57,27 +55,26 @@ export class TranslateService {
         },
       );
 
-      if (strs.length !== body.strs.length) {
+      let body = resp.data as TranslateDto;
+      if (body.strs.length !== missing.length) {
         throw new Error('Invalid AI_API response');
       }
 
-      body = resp.data as TranslateDto;
-    }
-
-    for (let i = 0; i < strs.length; i++) {
-      let hash = this.getHash(strs[i]);
-      let content = body.strs[i];
-      await this.translateRepository.save({
-        hash,
-        content,
-        language,
-      });
-    }
-
-    for (let i of cache) {
-      body.strs.splice(i.index, 0, i.content);
+      // 새 번역은 한 번에 저장한다 (같은 문자열이 여러 번 오면 한 행만)
+      let created = new Map<string, string>();
+      for (let j = 0; j < missing.length; j++) {
+        result[missing[j]] = body.strs[j];
+        created.set(hashes[missing[j]], body.strs[j]);
+      }
+      await this.translateRepository.save(
+        [...created].map(([hash, content]) => ({
+          hash,
+          content,
+          language,
+        })),
+      );
     }
 
-    return body;
+    return { strs: result, language };
   }
 }